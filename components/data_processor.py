@@ -4,6 +4,10 @@ import numpy as np
 from datetime import datetime, timedelta
 import re
 
+# Date layouts recognised by detect_data_types, matched at the start of a value:
+# YYYY-MM-DD, MM/DD/YYYY, MM-DD-YYYY, YYYY/MM/DD
+_DATE_PATTERNS = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}|\d{4}/\d{2}/\d{2}')
+
 class DataProcessor:
     """Component for processing and transforming data"""
     
@@ -25,21 +29,9 @@ class DataProcessor:
                 sample_values = df[col].dropna().head(100)
                 
                 # Check for date patterns
-                date_patterns = [
-                    r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-                    r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-                    r'\d{2}-\d{2}-\d{4}',  # MM-DD-YYYY
-                    r'\d{4}/\d{2}/\d{2}',  # YYYY/MM/DD
-                ]
-                
-                date_like_count = 0
-                for value in sample_values.astype(str):
-                    for pattern in date_patterns:
-                        if re.match(pattern, value):
-                            date_like_count += 1
-                            break
+                date_like_count = int(sample_values.astype(str).str.match(_DATE_PATTERNS).sum())
                 
-                if date_like_count / len(sample_values) > 0.7:
+                if len(sample_values) and date_like_count / len(sample_values) > 0.7:
                     suggestion = 'datetime64[ns]'
                 
                 # Check for numeric values stored as strings
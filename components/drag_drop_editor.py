@@ -323,11 +323,11 @@ def render_single_chart(container, chart_id, chart_config):
                 color_col = chart_config.get('color_column')
                 
                 if not display_df.empty:
-                    if filtered_df[x_col].dtype == 'object' and chart_config['type'] != "Scatter Plot":
+                    if filtered_df[x_col].dtype.name in ('object', 'category') and chart_config['type'] != "Scatter Plot":
                         if color_col and color_col in filtered_df.columns:
-                            display_df = filtered_df.groupby([x_col, color_col])[y_col].sum().reset_index()
+                            display_df = filtered_df.groupby([x_col, color_col], observed=True)[y_col].sum().reset_index()
                         else:
-                            display_df = filtered_df.groupby(x_col)[y_col].sum().reset_index()
+                            display_df = filtered_df.groupby(x_col, observed=True)[y_col].sum().reset_index()
                     
                     fig = create_chart(
                         chart_config['type'],
@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
 import uuid
+import functools
+import re
 
 st.set_page_config(page_title="Dashboard Builder", page_icon="📊", layout="wide")
 
@@ -26,13 +29,45 @@ from components.theme_manager import (
 from components.drag_drop_editor import (
     create_grid_layout_editor, render_dashboard_with_layout
 )
+from utils.dashboard_state import DashboardStateManager
+
+try:
+    import numba
+except ImportError:
+    numba = None  # Optional JIT for the group-sum hot path
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None  # Optional accelerated evaluation for dashboard filters
+
+# Charts with more points than this are drawn with WebGL instead of SVG
+WEBGL_POINT_THRESHOLD = 5000
+
+# Upper bound on points sent to the browser per chart
+DOWNSAMPLE_POINTS = 2000
+
+# Dashboard charts past this index stay hidden until the user opens them
+EAGER_CHART_COUNT = 4
+
+def _is_noop_value_filter(series, values):
+    """Selecting every category of a NaN-free categorical column keeps all rows"""
+    return (isinstance(series.dtype, pd.CategoricalDtype)
+            and series.cat.categories.isin(values).all() and not series.hasnans)
 
 def apply_dashboard_filters(df, filters):
-    """Apply dashboard filters to dataframe"""
+    """Apply dashboard filters to dataframe
+    
+    All active filters are fused into a single query so the frame is
+    indexed once; numexpr evaluates it when installed. Operands are passed
+    as local variables, which keeps arbitrary column names out of the
+    query string.
+    """
     if not filters:
         return df
     
-    filtered_df = df.copy()
+    conditions = []
+    local_dict = {}
     
     try:
         # Apply date filters
@@ -40,65 +75,360 @@ def apply_dashboard_filters(df, filters):
             date_col = filters['date_column']
             date_range = filters['date_range']
             
-            if date_col in filtered_df.columns and len(date_range) == 2:
-                # Convert date column to datetime if needed
-                if not filtered_df[date_col].dtype.name.startswith('datetime'):
-                    filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], errors='coerce')
+            if date_col in df.columns and len(date_range) == 2:
+                # Convert date column to datetime if needed (mask only, no write-back)
+                date_values = df[date_col]
+                if not date_values.dtype.name.startswith('datetime'):
+                    date_values = pd.to_datetime(date_values, errors='coerce')
                 
-                start_date = pd.to_datetime(date_range[0])
-                end_date = pd.to_datetime(date_range[1])
-                filtered_df = filtered_df[
-                    (filtered_df[date_col] >= start_date) & 
-                    (filtered_df[date_col] <= end_date)
-                ]
+                local_dict.update(
+                    date_values=date_values,
+                    start_date=pd.to_datetime(date_range[0]),
+                    end_date=pd.to_datetime(date_range[1])
+                )
+                conditions.append("(@date_values >= @start_date) & (@date_values <= @end_date)")
         
-        # Apply category filters
-        if 'category_column' in filters and 'categories' in filters:
-            cat_col = filters['category_column']
-            categories = filters['categories']
-            
-            if cat_col in filtered_df.columns and categories:
-                filtered_df = filtered_df[filtered_df[cat_col].isin(categories)]
+        # Apply category and region filters
+        for name, column_key, values_key in (
+            ('category', 'category_column', 'categories'),
+            ('region', 'region_column', 'regions')
+        ):
+            if column_key in filters and values_key in filters:
+                column = filters[column_key]
+                values = filters[values_key]
+                
+                if column in df.columns and values:
+                    values = pd.Index(values)
+                    if not _is_noop_value_filter(df[column], values):
+                        local_dict[f'{name}_values'] = df[column]
+                        local_dict[f'{name}_selected'] = values
+                        conditions.append(f"(@{name}_values in @{name}_selected)")
         
-        # Apply region filters
-        if 'region_column' in filters and 'regions' in filters:
-            region_col = filters['region_column']
-            regions = filters['regions']
-            
-            if region_col in filtered_df.columns and regions:
-                filtered_df = filtered_df[filtered_df[region_col].isin(regions)]
+        if not conditions:
+            return df
         
-        return filtered_df
+        return df.query(
+            " & ".join(conditions),
+            engine='numexpr' if numexpr is not None else 'python',
+            local_dict=local_dict
+        )
     
     except Exception as e:
         st.warning(f"Error applying filters: {str(e)}")
         return df
 
-def create_chart(chart_type, data, x_col, y_col, color_col=None, title="Chart"):
-    """Create a plotly chart based on type and parameters"""
-    try:
-        if chart_type == "Line Chart":
-            fig = px.line(data, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Bar Chart":
-            fig = px.bar(data, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Scatter Plot":
-            fig = px.scatter(data, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Pie Chart":
-            if color_col:
-                fig = px.pie(data, values=y_col, names=color_col, title=title)
-            else:
-                fig = px.pie(data, values=y_col, names=x_col, title=title)
-        elif chart_type == "Area Chart":
-            fig = px.area(data, x=x_col, y=y_col, color=color_col, title=title)
-        else:
-            return None
+def get_column_metadata(data_source_name, df):
+    """Return cached column metadata arrays for a data source"""
+    if 'column_metadata' not in st.session_state:
+        st.session_state.column_metadata = {}
+    
+    meta = st.session_state.column_metadata.get(data_source_name)
+    
+    # Rebuild only when the data source has been replaced
+    if meta is None or meta['frame'] is not df:
+        dtype_names = df.dtypes.astype(str)
+        meta = {
+            'frame': df,
+            'version': uuid.uuid4().hex,
+            'names': df.columns,
+            'lower_names': df.columns.astype(str).str.lower(),
+            'is_text': dtype_names.isin(['object', 'category']).to_numpy(),
+            'is_datetime': dtype_names.str.startswith('datetime').to_numpy()
+        }
+        st.session_state.column_metadata[data_source_name] = meta
+    
+    return meta
+
+def name_contains_any(meta, keywords):
+    """Boolean mask of columns whose lowercased name contains any keyword"""
+    pattern = '|'.join(re.escape(keyword) for keyword in keywords)
+    return np.asarray(meta['lower_names'].str.contains(pattern, regex=True), dtype=bool)
+
+def data_source_version(data_source_name, df):
+    """Token that changes whenever a data source frame is replaced"""
+    return get_column_metadata(data_source_name, df)['version']
+
+def _dt(value):
+    """Normalize a date-like filter bound to integer nanoseconds"""
+    return None if value is None else pd.Timestamp(value).value
+
+def filter_signature(filters):
+    """Build a small, order-independent hashable key from a dashboard filter dict
+    
+    Cached functions take this plus a data source name instead of the
+    dataframe itself, so st.cache_data never has to hash large frames.
+    """
+    if not filters:
+        return ()
+    
+    return (
+        filters.get('date_column'),
+        tuple(_dt(bound) for bound in filters.get('date_range', ())),
+        filters.get('category_column'),
+        tuple(sorted(filters.get('categories', ()), key=str)),
+        filters.get('region_column'),
+        tuple(sorted(filters.get('regions', ()), key=str))
+    )
+
+def filters_from_key(filter_key):
+    """Rebuild a dashboard filter dict from a filter_signature tuple"""
+    if not filter_key:
+        return {}
+    
+    date_col, date_range, cat_col, categories, region_col, regions = filter_key
+    filters = {}
+    if date_col is not None:
+        filters['date_column'] = date_col
+        filters['date_range'] = [pd.Timestamp(bound) for bound in date_range]
+    if cat_col is not None:
+        filters['category_column'] = cat_col
+        filters['categories'] = list(categories)
+    if region_col is not None:
+        filters['region_column'] = region_col
+        filters['regions'] = list(regions)
+    return filters
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _group_sum_kernel(codes, values, ngroups):
+        # Serial on purpose: a parallel scatter-add into out[code] would race
+        out = np.zeros(ngroups)
+        for i in range(len(codes)):
+            code = codes[i]
+            value = values[i]
+            # Match pandas: skip missing keys and NaN values
+            if code >= 0 and value == value:
+                out[code] += value
+        return out
+else:
+    _group_sum_kernel = None
+
+def group_sum(df, x_col, y_col):
+    """Group-sum y_col by a single key column, JIT-compiled for float columns when Numba is installed"""
+    y_series = df[y_col]
+    # The kernel accumulates in float64, so integer columns are left to pandas' exact sums
+    if _group_sum_kernel is None or not pd.api.types.is_float_dtype(y_series):
+        return df.groupby(x_col, observed=True)[y_col].sum().reset_index()
+    
+    codes, uniques = pd.factorize(df[x_col], sort=True)
+    sums = _group_sum_kernel(
+        codes.astype(np.int64),
+        y_series.to_numpy(np.float64, na_value=np.nan),
+        len(uniques)
+    )
+    
+    return pd.DataFrame({x_col: uniques, y_col: sums})
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def aggregate_chart_data(data_source_name, data_version, x_col, y_col, color_col, filter_key):
+    """Filter and group-sum a data source for a chart, cached per configuration
+    
+    Returns the aggregated frame and the number of rows left after filtering.
+    data_version only takes part in the cache key so that replaced data
+    sources never hit stale entries.
+    """
+    # Resolve by name from session state: Streamlit never hashes session state
+    # values, and a cache_resource store would be shared across all sessions
+    df = st.session_state.data_sources[data_source_name]
+    filtered_df = apply_dashboard_filters(df, filters_from_key(filter_key))
+    
+    if color_col:
+        aggregated_df = filtered_df.groupby([x_col, color_col], observed=True)[y_col].sum().reset_index()
+    else:
+        aggregated_df = group_sum(filtered_df, x_col, y_col)
+    return aggregated_df, len(filtered_df)
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that keep the series shape"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
         
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        areas = np.abs(
+            (x[selected] - avg_x) * (y[start:end] - y[selected]) -
+            (x[selected] - x[start:end]) * (avg_y - y[selected])
+        )
+        selected = start + int(np.argmax(areas))
+        indices[i + 1] = selected
+    
+    return indices
+
+def _lttb_frame(df, x_col, y_col, n_out):
+    """Downsample one series with LTTB after sorting it along the x-axis"""
+    series_df = df.dropna(subset=[x_col, y_col]).sort_values(x_col)
+    x_series = series_df[x_col]
+    if pd.api.types.is_datetime64_any_dtype(x_series):
+        # tz-aware columns convert to an object array, so drop to naive UTC first
+        if x_series.dt.tz is not None:
+            x_series = x_series.dt.tz_convert(None)
+        x_values = x_series.to_numpy().view('int64')
+    else:
+        x_values = x_series.to_numpy()
+    
+    indices = lttb_indices(x_values.astype(np.float64), series_df[y_col].to_numpy(np.float64), n_out)
+    return series_df.iloc[indices]
+
+def downsample(df, x_col, y_col, chart_type, max_points=DOWNSAMPLE_POINTS, color_col=None):
+    """Reduce a frame to roughly max_points rows before plotting
+    
+    Line and area charts over a numeric or datetime x-axis are reduced with
+    LTTB (per color group) so trends keep their shape; scatter plots use a
+    seeded sample so the same points are shown on every rerun. Other charts
+    are left untouched because sampling would drop categories or change totals.
+    """
+    if len(df) <= max_points:
+        return df
+    
+    x_series = df[x_col]
+    lttb_axis = pd.api.types.is_numeric_dtype(x_series) or pd.api.types.is_datetime64_any_dtype(x_series)
+    if chart_type in ("Line Chart", "Area Chart") and lttb_axis and pd.api.types.is_numeric_dtype(df[y_col]):
+        if color_col and color_col in df.columns:
+            parts = [
+                _lttb_frame(group_df, x_col, y_col, max(3, max_points * len(group_df) // len(df)))
+                for _, group_df in df.groupby(color_col, sort=False, observed=True)
+            ]
+            return pd.concat(parts) if parts else df
+        return _lttb_frame(df, x_col, y_col, max_points)
+    
+    if chart_type == "Scatter Plot":
+        return df.sample(max_points, random_state=0)
+    return df
+
+def _render_mode(num_points):
+    """Use WebGL traces once SVG becomes the browser bottleneck"""
+    return 'webgl' if num_points > WEBGL_POINT_THRESHOLD else 'svg'
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def unique_values(data_source_name, data_version, column):
+    """Distinct non-null values of a data source column, cached per data version"""
+    series = st.session_state.data_sources[data_source_name][column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.categories
+    return pd.Index(series.dropna().unique())
+
+def filter_options(data_source_names, column):
+    """Union of a column's distinct values across the given data sources"""
+    indexes = []
+    for name in data_source_names:
+        df = st.session_state.data_sources.get(name)
+        if df is not None and column in df.columns:
+            indexes.append(unique_values(name, data_source_version(name, df), column))
+    
+    if not indexes:
+        return []
+    return functools.reduce(lambda left, right: left.union(right), indexes).tolist()
+
+def _line_chart(data, x, y, color, title, render_mode, fill=None):
+    """Line chart built from numpy arrays, one trace per color group
+    
+    Plotly ships numpy arrays to the browser as base64 typed arrays, which
+    skips the per-value JSON formatting of the plotly express path.
+    """
+    trace_type = go.Scattergl if render_mode == 'webgl' else go.Scatter
+    if color:
+        groups = [(str(name), group) for name, group in data.groupby(color, sort=False, observed=True)]
+    else:
+        groups = [(None, data)]
+    
+    fig = go.Figure([
+        trace_type(
+            x=group[x].to_numpy(),
+            y=group[y].to_numpy(),
+            mode='lines',
+            name=name,
+            fill=fill,
+            showlegend=name is not None
+        )
+        for name, group in groups
+    ])
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color)
+    return fig
+
+def _area_chart(data, x, y, color, title, render_mode):
+    """Area chart builder; large series are drawn as filled WebGL lines"""
+    if render_mode == 'webgl':
+        # px.area has no WebGL mode; draw filled Scattergl lines instead
+        return _line_chart(data, x, y, color, title, render_mode, fill='tozeroy')
+    return px.area(data, x=x, y=y, color=color, title=title)
+
+# Chart type -> figure builder taking (data, x, y, color, title, render_mode)
+_CHART_BUILDERS = {
+    "Line Chart": _line_chart,
+    "Bar Chart": lambda d, x, y, c, t, mode: px.bar(d, x=x, y=y, color=c, title=t),
+    "Scatter Plot": lambda d, x, y, c, t, mode: px.scatter(d, x=x, y=y, color=c, title=t, render_mode=mode),
+    "Pie Chart": lambda d, x, y, c, t, mode: px.pie(d, values=y, names=c or x, title=t),
+    "Area Chart": _area_chart,
+}
+
+def create_chart(chart_type, data, x_col, y_col, color_col=None, title="Chart", source_rows=None):
+    """Create a plotly chart based on type and parameters
+    
+    source_rows is the row count before downsampling; it picks the render
+    mode, since the downsampled frame itself never reaches the WebGL threshold.
+    """
+    builder = _CHART_BUILDERS.get(chart_type)
+    if builder is None:
+        return None
+    
+    try:
+        num_points = len(data) if source_rows is None else source_rows
+        fig = builder(data, x_col, y_col, color_col, title, _render_mode(num_points))
         fig.update_layout(height=400)
         return fig
     except Exception as e:
         st.error(f"Error creating chart: {str(e)}")
         return None
 
+def build_dashboard_chart(chart_config, df, filters):
+    """Filter, aggregate and plot one dashboard chart
+    
+    Returns the figure (None when nothing is left to plot) and the number
+    of rows remaining after the dashboard filters.
+    """
+    data_source = chart_config['data_source']
+    x_col = chart_config['x_column']
+    y_col = chart_config['y_column']
+    color_col = chart_config.get('color_column')
+    
+    # Categorical x-axes are filtered and aggregated through the
+    # cache; other charts plot the filtered rows directly
+    if df[x_col].dtype.name in ('object', 'category') and chart_config['type'] != "Scatter Plot":
+        group_color = color_col if color_col and color_col in df.columns else None
+        display_df, filtered_rows = aggregate_chart_data(
+            data_source, data_source_version(data_source, df),
+            x_col, y_col, group_color, filter_signature(filters)
+        )
+    else:
+        display_df = apply_dashboard_filters(df, filters)
+        filtered_rows = len(display_df)
+    
+    if filtered_rows == 0:
+        return None, 0
+    
+    source_rows = len(display_df)
+    display_df = downsample(display_df, x_col, y_col, chart_config['type'], color_col=color_col)
+    fig = create_chart(chart_config['type'], display_df, x_col, y_col, color_col, chart_config['title'],
+                       source_rows=source_rows)
+    return fig, filtered_rows
+
+def _bump_filters_version():
+    """on_change callback marking the dashboard filters as changed"""
+    st.session_state.filters_version = st.session_state.get('filters_version', 0) + 1
+
 def main():
     # Initialize advanced features
     init_collaboration_state()
@@ -192,82 +522,91 @@ def main():
     
     with tab1:
         # Chart builder section
-    with st.expander("➕ Add New Chart", expanded=True):
-        col1, col2 = st.columns([2, 1])
+        with st.expander("➕ Add New Chart", expanded=True):
+            col1, col2 = st.columns([2, 1])
         
-        with col1:
-            # Data source selection
-            data_source = st.selectbox("Select Data Source", list(st.session_state.data_sources.keys()))
+            with col1:
+                # Data source selection
+                data_source = st.selectbox("Select Data Source", list(st.session_state.data_sources.keys()))
             
-            if data_source:
-                df = st.session_state.data_sources[data_source]
+                if data_source:
+                    df = st.session_state.data_sources[data_source]
                 
-                # Chart configuration
-                chart_col1, chart_col2 = st.columns(2)
+                    # Chart configuration
+                    chart_col1, chart_col2 = st.columns(2)
                 
-                with chart_col1:
-                    chart_type = st.selectbox("Chart Type", [
-                        "Line Chart", "Bar Chart", "Pie Chart", "Scatter Plot", "Area Chart"
-                    ])
-                    x_column = st.selectbox("X-Axis", df.columns)
+                    with chart_col1:
+                        chart_type = st.selectbox("Chart Type", [
+                            "Line Chart", "Bar Chart", "Pie Chart", "Scatter Plot", "Area Chart"
+                        ])
+                        x_column = st.selectbox("X-Axis", df.columns)
                     
-                with chart_col2:
-                    if chart_type != "Pie Chart":
-                        y_column = st.selectbox("Y-Axis", df.select_dtypes(include=['number']).columns)
-                    else:
-                        y_column = st.selectbox("Values", df.select_dtypes(include=['number']).columns)
+                    with chart_col2:
+                        if chart_type != "Pie Chart":
+                            y_column = st.selectbox("Y-Axis", df.select_dtypes(include=['number']).columns)
+                        else:
+                            y_column = st.selectbox("Values", df.select_dtypes(include=['number']).columns)
                     
-                    color_column = st.selectbox("Color By (Optional)", 
-                                              ["None"] + list(df.select_dtypes(include=['object', 'category']).columns))
-                    if color_column == "None":
-                        color_column = None
+                        color_column = st.selectbox("Color By (Optional)", 
+                                                  ["None"] + list(df.select_dtypes(include=['object', 'category']).columns))
+                        if color_column == "None":
+                            color_column = None
+                
+                    # Chart title and preview
+                    chart_title = st.text_input("Chart Title", value=f"{chart_type} - {x_column} vs {y_column}")
                 
-                # Chart title and preview
-                chart_title = st.text_input("Chart Title", value=f"{chart_type} - {x_column} vs {y_column}")
+            with col2:
+                st.subheader("Chart Preview")
                 
-        with col2:
-            st.subheader("Chart Preview")
+                # Building the preview is deferred to an explicit click so that
+                # editing the configuration (e.g. typing a title) stays cheap
+                preview_requested = st.button("👁️ Preview Chart", key="preview_chart")
+                if not preview_requested:
+                    st.caption("Click Preview Chart to render the current configuration")
             
-            if data_source and x_column and y_column:
-                # Apply basic data aggregation for better visualization
-                preview_df = df.copy()
+                if preview_requested and data_source and x_column and y_column:
+                    # Apply basic data aggregation for better visualization
+                    preview_df = df
                 
-                # For categorical x-axis, aggregate y values
-                if df[x_column].dtype == 'object' or df[x_column].dtype.name == 'category':
-                    if chart_type != "Scatter Plot":
-                        preview_df = df.groupby(x_column)[y_column].sum().reset_index()
-                        if color_column and color_column in df.columns:
-                            preview_df = df.groupby([x_column, color_column])[y_column].sum().reset_index()
+                    # For categorical x-axis, aggregate y values
+                    if df[x_column].dtype == 'object' or df[x_column].dtype.name == 'category':
+                        if chart_type != "Scatter Plot":
+                            group_color = color_column if color_column and color_column in df.columns else None
+                            preview_df, _ = aggregate_chart_data(
+                                data_source, data_source_version(data_source, df),
+                                x_column, y_column, group_color, ()
+                            )
                 
-                # Limit data points for better performance
-                if len(preview_df) > 1000:
-                    preview_df = preview_df.sample(1000)
+                    # Limit data points for better performance
+                    source_rows = len(preview_df)
+                    preview_df = downsample(preview_df, x_column, y_column, chart_type, max_points=1000, color_col=color_column)
                 
-                preview_fig = create_chart(chart_type, preview_df, x_column, y_column, color_column, chart_title)
-                if preview_fig:
-                    preview_fig.update_layout(height=250)
-                    st.plotly_chart(preview_fig, use_container_width=True)
+                    preview_fig = create_chart(chart_type, preview_df, x_column, y_column, color_column, chart_title,
+                                               source_rows=source_rows)
+                    if preview_fig:
+                        preview_fig.update_layout(height=250)
+                        st.plotly_chart(preview_fig, use_container_width=True)
         
-        # Add chart to dashboard
-        if st.button("Add Chart to Dashboard", type="primary"):
-            if data_source and x_column and y_column:
-                chart_id = str(uuid.uuid4())
-                current_dashboard['charts'][chart_id] = {
-                    'type': chart_type,
-                    'data_source': data_source,
-                    'x_column': x_column,
-                    'y_column': y_column,
-                    'color_column': color_column,
-                    'title': chart_title,
-                    'created': datetime.now().isoformat()
-                }
-                # Track collaboration activity
-                try:
-                    add_user_activity("chart_added", f"Added '{chart_title}' to dashboard")
-                except:
-                    pass
-                st.success(f"Chart '{chart_title}' added to dashboard!")
-                st.rerun()
+            # Add chart to dashboard
+            if st.button("Add Chart to Dashboard", type="primary"):
+                if data_source and x_column and y_column:
+                    chart_id = str(uuid.uuid4())
+                    current_dashboard['charts'][chart_id] = {
+                        'type': chart_type,
+                        'data_source': data_source,
+                        'x_column': x_column,
+                        'y_column': y_column,
+                        'color_column': color_column,
+                        'title': chart_title,
+                        'created': datetime.now().isoformat()
+                    }
+                    # Track collaboration activity
+                    try:
+                        add_user_activity("chart_added", f"Added '{chart_title}' to dashboard")
+                    except:
+                        pass
+                    st.success(f"Chart '{chart_title}' added to dashboard!")
+                    st.rerun()
     
     with tab2:
         # Drag-and-drop layout editor
@@ -351,6 +690,8 @@ def main():
             # Initialize filter state
             if 'dashboard_filters' not in st.session_state:
                 st.session_state.dashboard_filters = {}
+            if 'rendered_charts' not in st.session_state:
+                st.session_state.rendered_charts = {}
             
             filter_col1, filter_col2, filter_col3 = st.columns(3)
             
@@ -359,38 +700,34 @@ def main():
             all_category_columns = set()
             all_region_columns = set()
             
-            for chart_config in current_dashboard['charts'].values():
-                data_source_name = chart_config['data_source']
+            dashboard_sources = {chart_config['data_source'] for chart_config in current_dashboard['charts'].values()}
+            for data_source_name in dashboard_sources:
                 if data_source_name in st.session_state.data_sources:
                     df = st.session_state.data_sources[data_source_name]
+                    meta = get_column_metadata(data_source_name, df)
                     
                     # Date columns
-                    date_cols = [col for col in df.columns if 
-                                df[col].dtype.name.startswith('datetime') or 
-                                'date' in col.lower()]
-                    all_date_columns.update(date_cols)
+                    date_mask = meta['is_datetime'] | name_contains_any(meta, ('date',))
+                    all_date_columns.update(meta['names'][date_mask])
                     
                     # Category columns (text/object columns)
-                    cat_cols = [col for col in df.columns if 
-                               df[col].dtype == 'object' and 
-                               ('category' in col.lower() or 'type' in col.lower() or 'class' in col.lower())]
-                    all_category_columns.update(cat_cols)
+                    cat_mask = meta['is_text'] & name_contains_any(meta, ('category', 'type', 'class'))
+                    all_category_columns.update(meta['names'][cat_mask])
                     
                     # Region columns
-                    region_cols = [col for col in df.columns if 
-                                  df[col].dtype == 'object' and 
-                                  ('region' in col.lower() or 'location' in col.lower() or 'area' in col.lower())]
-                    all_region_columns.update(region_cols)
+                    region_mask = meta['is_text'] & name_contains_any(meta, ('region', 'location', 'area'))
+                    all_region_columns.update(meta['names'][region_mask])
             
             with filter_col1:
                 st.subheader("📅 Date Filters")
                 if all_date_columns:
-                    selected_date_col = st.selectbox("Date Column", ["None"] + list(all_date_columns))
+                    selected_date_col = st.selectbox("Date Column", ["None"] + list(all_date_columns), on_change=_bump_filters_version)
                     if selected_date_col != "None":
                         date_range = st.date_input(
                             "Select Date Range",
                             value=[datetime.now().date() - timedelta(days=30), datetime.now().date()],
-                            key="dashboard_date_filter"
+                            key="dashboard_date_filter",
+                            on_change=_bump_filters_version
                         )
                         st.session_state.dashboard_filters['date_column'] = selected_date_col
                         st.session_state.dashboard_filters['date_range'] = date_range
@@ -400,21 +737,16 @@ def main():
             with filter_col2:
                 st.subheader("📊 Category Filters")
                 if all_category_columns:
-                    selected_cat_col = st.selectbox("Category Column", ["None"] + list(all_category_columns))
+                    selected_cat_col = st.selectbox("Category Column", ["None"] + list(all_category_columns), on_change=_bump_filters_version)
                     if selected_cat_col != "None":
                         # Get unique values for selected category column
-                        cat_values = set()
-                        for chart_config in current_dashboard['charts'].values():
-                            data_source_name = chart_config['data_source']
-                            if data_source_name in st.session_state.data_sources:
-                                df = st.session_state.data_sources[data_source_name]
-                                if selected_cat_col in df.columns:
-                                    cat_values.update(df[selected_cat_col].dropna().unique())
+                        cat_values = filter_options(dashboard_sources, selected_cat_col)
                         
                         selected_categories = st.multiselect(
                             "Select Categories",
-                            options=list(cat_values),
-                            key="dashboard_category_filter"
+                            options=cat_values,
+                            key="dashboard_category_filter",
+                            on_change=_bump_filters_version
                         )
                         st.session_state.dashboard_filters['category_column'] = selected_cat_col
                         st.session_state.dashboard_filters['categories'] = selected_categories
@@ -424,21 +756,16 @@ def main():
             with filter_col3:
                 st.subheader("🗺️ Region Filters")
                 if all_region_columns:
-                    selected_region_col = st.selectbox("Region Column", ["None"] + list(all_region_columns))
+                    selected_region_col = st.selectbox("Region Column", ["None"] + list(all_region_columns), on_change=_bump_filters_version)
                     if selected_region_col != "None":
                         # Get unique values for selected region column
-                        region_values = set()
-                        for chart_config in current_dashboard['charts'].values():
-                            data_source_name = chart_config['data_source']
-                            if data_source_name in st.session_state.data_sources:
-                                df = st.session_state.data_sources[data_source_name]
-                                if selected_region_col in df.columns:
-                                    region_values.update(df[selected_region_col].dropna().unique())
+                        region_values = filter_options(dashboard_sources, selected_region_col)
                         
                         selected_regions = st.multiselect(
                             "Select Regions",
-                            options=list(region_values),
-                            key="dashboard_region_filter"
+                            options=region_values,
+                            key="dashboard_region_filter",
+                            on_change=_bump_filters_version
                         )
                         st.session_state.dashboard_filters['region_column'] = selected_region_col
                         st.session_state.dashboard_filters['regions'] = selected_regions
@@ -448,6 +775,7 @@ def main():
             # Clear filters button
             if st.button("🗑️ Clear All Filters", type="secondary"):
                 st.session_state.dashboard_filters = {}
+                _bump_filters_version()
                 st.rerun()
         
         # Display charts in grid layout
@@ -473,49 +801,49 @@ def main():
                         with chart_header_col2:
                             if st.button("🗑️", key=f"delete_{chart_key}", help="Delete chart"):
                                 del current_dashboard['charts'][chart_key]
+                                st.session_state.rendered_charts.pop(chart_key, None)
                                 st.rerun()
                         
+                        # Off-screen charts skip the filter/aggregate/plot pipeline until opened
+                        show_chart = st.checkbox(
+                            "Show chart",
+                            value=(i + j) < EAGER_CHART_COUNT,
+                            key=f"exp_{chart_key}"
+                        )
+                        
                         # Render chart with filters applied
                         try:
                             data_source = chart_config['data_source']
-                            if data_source in st.session_state.data_sources:
+                            if not show_chart:
+                                st.caption("Chart hidden - tick 'Show chart' to render it")
+                            elif data_source in st.session_state.data_sources:
                                 df = st.session_state.data_sources[data_source]
                                 
-                                # Apply dashboard filters first
-                                filtered_df = apply_dashboard_filters(df, st.session_state.get('dashboard_filters', {}))
+                                # Reuse the last figure unless filters, chart config or data changed
+                                render_key = (
+                                    st.session_state.get('filters_version', 0),
+                                    json.dumps(chart_config, sort_keys=True, default=str),
+                                    data_source_version(data_source, df)
+                                )
+                                rendered = st.session_state.rendered_charts.get(chart_key)
+                                if rendered is None or rendered[0] != render_key:
+                                    fig, filtered_rows = build_dashboard_chart(
+                                        chart_config, df, st.session_state.get('dashboard_filters', {})
+                                    )
+                                    rendered = (render_key, fig, filtered_rows)
+                                    st.session_state.rendered_charts[chart_key] = rendered
+                                _, fig, filtered_rows = rendered
                                 
                                 # Show filter status
-                                if len(filtered_df) < len(df):
-                                    st.caption(f"📊 Showing {len(filtered_df):,} of {len(df):,} records (filtered)")
+                                if filtered_rows < len(df):
+                                    st.caption(f"📊 Showing {filtered_rows:,} of {len(df):,} records (filtered)")
                                 
-                                # Apply aggregation for better visualization
-                                display_df = filtered_df.copy()
-                                x_col = chart_config['x_column']
-                                y_col = chart_config['y_column']
-                                color_col = chart_config.get('color_column')
-                                
-                                if not display_df.empty:
-                                    if filtered_df[x_col].dtype == 'object' and chart_config['type'] != "Scatter Plot":
-                                        if color_col and color_col in filtered_df.columns:
-                                            display_df = filtered_df.groupby([x_col, color_col])[y_col].sum().reset_index()
-                                        else:
-                                            display_df = filtered_df.groupby(x_col)[y_col].sum().reset_index()
-                                    
-                                    fig = create_chart(
-                                        chart_config['type'],
-                                        display_df,
-                                        x_col,
-                                        y_col,
-                                        color_col,
-                                        chart_config['title']
-                                    )
-                                    
-                                    if fig:
-                                        st.plotly_chart(fig, use_container_width=True)
-                                    else:
-                                        st.error("Failed to render chart")
-                                else:
+                                if filtered_rows == 0:
                                     st.warning("No data available after applying filters")
+                                elif fig:
+                                    st.plotly_chart(fig, use_container_width=True)
+                                else:
+                                    st.error("Failed to render chart")
                             else:
                                 st.error(f"Data source '{data_source}' not found")
                         except Exception as e:
@@ -526,17 +854,29 @@ def main():
     # Dashboard actions
     if current_dashboard.get('charts'):
         st.divider()
-        action_col1, action_col2, action_col3 = st.columns(3)
+        action_col1, action_col2, action_col3, action_col4 = st.columns(4)
         
         with action_col1:
             if st.button("💾 Save Dashboard", type="primary"):
-                st.success("Dashboard saved successfully!")
+                success, message = DashboardStateManager.save_dashboard(st.session_state.current_dashboard)
+                if success:
+                    st.success("Dashboard saved successfully!")
+                else:
+                    st.error(message)
         
         with action_col2:
+            if st.button("↩️ Revert to Saved"):
+                success, message = DashboardStateManager.load_dashboard(st.session_state.current_dashboard)
+                if success:
+                    st.rerun()
+                else:
+                    st.error(message)
+        
+        with action_col3:
             if st.button("📋 Generate Report"):
                 st.switch_page("pages/3_Reports.py")
         
-        with action_col3:
+        with action_col4:
             if st.button("🔄 Refresh Data"):
                 st.success("Data refreshed!")
                 st.rerun()
@@ -4,9 +4,99 @@ import numpy as np
 from datetime import datetime
 import io
 import json
+import re
+
+from utils.data_storage import DataStorageManager
+
+try:
+    import cudf
+except ImportError:
+    cudf = None  # Optional GPU CSV parser
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None  # Optional multithreaded CSV parser
 
 st.set_page_config(page_title="Data Sources", page_icon="📁", layout="wide")
 
+# Uploads above this size are previewed from their first rows only
+LARGE_UPLOAD_BYTES = 50 * 1024 * 1024
+PREVIEW_ROWS = 1000
+
+# Rows sent to the browser for the Data Preview sample grid
+SAMPLE_ROWS = 100
+
+# Column-name cleanup: spaces and dashes become underscores, other symbols are dropped
+_NAME_SEPARATORS = str.maketrans({' ': '_', '-': '_'})
+_NAME_DISALLOWED = re.compile(r'\W')
+
+# Common date layouts: YYYY-MM-DD, MM/DD/YYYY, MM-DD-YYYY, Month DD, YYYY
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}|\w+ \d{1,2}, \d{4}')
+
+def csv_parsers():
+    """CSV parser backends available in this environment"""
+    parsers = ["pyarrow", "pandas"]
+    if pl is not None:
+        parsers.insert(0, "polars")
+    if cudf is not None:
+        parsers.append("cudf")
+    return parsers
+
+def read_csv_typed(file_bytes, sample_rows=10_000):
+    """C-parser read with dtypes taken from a sampled prefix of the file"""
+    sample = pd.read_csv(io.BytesIO(file_bytes), nrows=sample_rows)
+    
+    # Only pin numeric and boolean columns; text stays object either way
+    dtypes = {col: dtype for col, dtype in sample.dtypes.items()
+              if pd.api.types.is_numeric_dtype(dtype)}
+    if len(sample) < sample_rows or not dtypes:
+        return pd.read_csv(io.BytesIO(file_bytes))
+    
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), dtype=dtypes, low_memory=False)
+    except (ValueError, TypeError, OverflowError):
+        # A value later in the file does not fit the sampled dtype
+        return pd.read_csv(io.BytesIO(file_bytes))
+
+@st.cache_data(show_spinner=False)
+def load_csv(file_bytes, parser="pyarrow"):
+    """Parse uploaded CSV bytes, cached so reruns skip re-parsing"""
+    if parser == "pandas":
+        return read_csv_typed(file_bytes)
+    
+    if parser == "polars" and pl is not None:
+        try:
+            # Converted at the boundary so the rest of the app keeps numpy dtypes
+            return pl.read_csv(io.BytesIO(file_bytes)).to_pandas()
+        except Exception:
+            pass
+    
+    if parser == "cudf" and cudf is not None:
+        try:
+            # GPU tokenization, handed back as a regular pandas frame
+            return cudf.read_csv(io.BytesIO(file_bytes)).to_pandas()
+        except Exception:
+            pass
+    
+    try:
+        # Arrow's multithreaded parser; pyarrow ships with streamlit
+        return pd.read_csv(io.BytesIO(file_bytes), engine='pyarrow')
+    except Exception:
+        # Fall back to the C parser for files Arrow rejects
+        return read_csv_typed(file_bytes)
+
+@st.cache_data(show_spinner=False)
+def load_csv_preview(file_bytes, nrows=PREVIEW_ROWS):
+    """Parse only the first rows of uploaded CSV bytes"""
+    if pl is not None:
+        try:
+            # Polars stops tokenizing after n_rows, like pandas' nrows
+            return pl.read_csv(io.BytesIO(file_bytes), n_rows=nrows).to_pandas()
+        except Exception:
+            pass
+    return pd.read_csv(io.BytesIO(file_bytes), nrows=nrows)
+
 def validate_dataframe(df, filename):
     """Validate uploaded dataframe and return validation results"""
     issues = []
@@ -21,27 +111,136 @@ def validate_dataframe(df, filename):
     if df.columns.duplicated().any():
         issues.append("❌ Duplicate column names found")
     
-    # Check for missing values
-    missing_cols = df.columns[df.isnull().any()].tolist()
-    if missing_cols:
-        suggestions.append(f"⚠️ Missing values found in columns: {', '.join(missing_cols[:5])}")
+    # Classify columns and check for missing values in one pass
+    missing_cols = []
+    numeric_cols = []
+    text_cols = []
+    for col, series in df.items():
+        # Only the first five are reported, so stop probing for NaNs after that
+        if len(missing_cols) < 5 and series.hasnans:
+            missing_cols.append(col)
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            numeric_cols.append(col)
+        elif series.dtype == object:
+            text_cols.append(col)
     
-    # Check data types
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    text_cols = df.select_dtypes(include=['object']).columns
+    if missing_cols:
+        suggestions.append(f"⚠️ Missing values found in columns: {', '.join(map(str, missing_cols))}")
     
     suggestions.append(f"✅ Found {len(numeric_cols)} numeric columns and {len(text_cols)} text columns")
     
     # Suggest date parsing
-    potential_date_cols = [col for col in text_cols if 'date' in col.lower() or 'time' in col.lower()]
+    text_names = pd.Index(text_cols).astype(str)
+    potential_date_cols = text_names[text_names.str.contains('date|time', case=False, regex=True)].tolist()
     if potential_date_cols:
         suggestions.append(f"💡 Potential date columns detected: {', '.join(potential_date_cols)}")
     
     return issues, suggestions
 
-def clean_dataframe(df, options):
-    """Apply cleaning operations to dataframe based on user selections"""
-    cleaned_df = df.copy()
+def guess_column_format(series):
+    """Datetime format guessed from a sample of a text column, or None if the sample disagrees"""
+    sample = series.dropna().astype(str).head(100)
+    fmt = pd.tseries.api.guess_datetime_format(sample.iloc[0]) if len(sample) else None
+    if fmt and pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+        return fmt
+    return None
+
+def parse_datetime_column(series):
+    """Convert a column to datetime, using a format guessed from a sample"""
+    fmt = guess_column_format(series)
+    
+    # An explicit format takes pandas' fast path; repeated strings are parsed once
+    if fmt:
+        parsed = pd.to_datetime(series, format=fmt, errors='coerce', cache=True)
+        if parsed.notna().sum() == series.notna().sum():
+            return parsed
+    
+    return pd.to_datetime(series, format='mixed', errors='coerce', cache=True)
+
+def parse_datetime_columns_polars(df, columns):
+    """Parse several text date columns in one multithreaded Polars pass
+    
+    Each column is parsed with the format parse_datetime_column would use, so
+    ambiguous dates such as 03/04/2024 read the same with either library.
+    Only columns that Polars converts without losing a value are returned;
+    the rest are left for parse_datetime_column.
+    """
+    if pl is None:
+        return {}
+    
+    formats = {}
+    for col in columns:
+        if df[col].dtype == object:
+            fmt = guess_column_format(df[col])
+            # Fractional seconds and offsets are spelled differently in Polars' chrono formats
+            if fmt and '%f' not in fmt and '%z' not in fmt:
+                formats[col] = fmt
+    if not formats:
+        return {}
+    
+    try:
+        frame = pl.from_pandas(df[list(formats)]).with_columns(
+            pl.col(col).str.to_datetime(format=fmt, strict=False) for col, fmt in formats.items()
+        )
+    except Exception:
+        return {}
+    
+    parsed = {}
+    for col in formats:
+        if frame[col].null_count() == df[col].isna().sum():
+            parsed[col] = pd.Series(frame[col].to_numpy(), index=df.index, name=col)
+    return parsed
+
+def flag_outliers(df, method, threshold):
+    """Boolean frame marking outlying values in every numeric column at once"""
+    numeric = df.select_dtypes(include=[np.number])
+    values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+    if values.size == 0:
+        return pd.DataFrame(False, index=df.index, columns=numeric.columns)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if method == "IQR":
+            q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+            iqr = q3 - q1
+            mask = (values < q1 - threshold * iqr) | (values > q3 + threshold * iqr)
+        else:
+            z_scores = (values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0, ddof=1)
+            mask = np.abs(z_scores) > threshold
+    
+    return pd.DataFrame(mask, index=df.index, columns=numeric.columns)
+
+# Options that switch a cleaning step on; the rest only configure those steps
+CLEANING_STEPS = ('remove_empty', 'fill_missing', 'remove_duplicates',
+                  'apply_column_rename', 'parse_dates', 'optimize_types')
+
+def build_cleaning_options(fill_missing=False, missing_strategy='median', missing_text_strategy='Unknown',
+                           remove_duplicates=False, remove_empty=False, parse_dates=False, date_columns=(),
+                           optimize_types=False, apply_column_rename=False):
+    """Options dict for clean_dataframe from the upload-tab selections"""
+    return {
+        'fill_missing': fill_missing,
+        'missing_strategy': missing_strategy,
+        'missing_text_strategy': missing_text_strategy,
+        'remove_duplicates': remove_duplicates,
+        'remove_empty': remove_empty,
+        'parse_dates': parse_dates,
+        'date_columns': list(date_columns),
+        'optimize_types': optimize_types,
+        'apply_column_rename': apply_column_rename
+    }
+
+def has_cleaning_steps(options):
+    """True when at least one cleaning step is switched on"""
+    return any(options.get(step) for step in CLEANING_STEPS)
+
+def clean_column_name(name):
+    """Suggested column name: lowercase letters, digits and underscores only"""
+    return _NAME_DISALLOWED.sub('', str(name).strip().translate(_NAME_SEPARATORS).lower())
+
+def _clean_rows_pandas(df, options):
+    """Empty-row removal, missing-value handling and de-duplication in pandas"""
+    # Shallow copy: every step below replaces whole columns rather than writing into them
+    cleaned_df = df.copy(deep=False)
     
     # Remove completely empty rows
     if options.get('remove_empty'):
@@ -52,73 +251,282 @@ def clean_dataframe(df, options):
         missing_strategy = options.get('missing_strategy', 'median')
         missing_text_strategy = options.get('missing_text_strategy', 'Unknown')
         
-        for col in cleaned_df.columns:
-            if cleaned_df[col].dtype in ['object', 'string']:
-                if missing_text_strategy == 'Unknown':
-                    cleaned_df[col] = cleaned_df[col].fillna('Unknown')
-                elif missing_text_strategy == 'most_frequent':
-                    mode_val = cleaned_df[col].mode()
-                    fill_val = mode_val[0] if not mode_val.empty else 'Unknown'
-                    cleaned_df[col] = cleaned_df[col].fillna(fill_val)
-                elif missing_text_strategy == 'drop_rows':
-                    cleaned_df = cleaned_df.dropna(subset=[col])
+        text_cols = cleaned_df.select_dtypes(include=['object', 'string']).columns
+        num_cols = cleaned_df.select_dtypes(include=[np.number]).columns
+        
+        drop_subset = []
+        if missing_text_strategy == 'drop_rows':
+            drop_subset.extend(text_cols)
+        if missing_strategy == 'drop_rows':
+            drop_subset.extend(num_cols)
+        if drop_subset:
+            cleaned_df = cleaned_df.dropna(subset=drop_subset)
+        
+        # Collect one fill value per column, then fill the whole frame in a single call
+        fill_values = {}
+        if missing_text_strategy != 'drop_rows':
+            for col in text_cols:
+                fill_values[col] = 'Unknown'
+                if missing_text_strategy == 'most_frequent':
+                    # value_counts hashes each column once instead of sorting it like mode()
+                    counts = cleaned_df[col].value_counts()
+                    if len(counts):
+                        fill_values[col] = counts.index[0]
+        
+        if len(num_cols) and missing_strategy != 'drop_rows':
+            if missing_strategy == 'median':
+                fill_values.update(cleaned_df[num_cols].median().to_dict())
+            elif missing_strategy == 'mean':
+                fill_values.update(cleaned_df[num_cols].mean().to_dict())
             else:
-                if missing_strategy == 'median':
-                    cleaned_df[col] = cleaned_df[col].fillna(cleaned_df[col].median())
-                elif missing_strategy == 'mean':
-                    cleaned_df[col] = cleaned_df[col].fillna(cleaned_df[col].mean())
-                elif missing_strategy == 'zero':
-                    cleaned_df[col] = cleaned_df[col].fillna(0)
-                elif missing_strategy == 'drop_rows':
-                    cleaned_df = cleaned_df.dropna(subset=[col])
+                fill_values.update(dict.fromkeys(num_cols, 0))
+        
+        if fill_values:
+            cleaned_df = cleaned_df.fillna(fill_values)
     
     # Remove duplicates
     if options.get('remove_duplicates'):
         cleaned_df = cleaned_df.drop_duplicates()
     
+    return cleaned_df
+
+# Temporary column carrying row positions through the Polars cleaning plan
+POLARS_ROW_COLUMN = '__dp_row'
+
+def _clean_rows_polars(df, options):
+    """Same row-level cleaning as _clean_rows_pandas, as one Polars lazy plan"""
+    # Row positions travel with the plan so the original index can be restored
+    lf = pl.from_pandas(df, include_index=False).lazy().with_row_index(POLARS_ROW_COLUMN)
+    schema = lf.collect_schema()
+    text_cols = [col for col, dtype in schema.items() if dtype == pl.String]
+    num_cols = [col for col, dtype in schema.items() if dtype.is_numeric() and col != POLARS_ROW_COLUMN]
+    # Filling a column without nulls would still promote ints to float, so those are skipped
+    has_nulls = set(df.columns[df.isna().any().to_numpy()])
+    
+    if options.get('remove_empty'):
+        lf = lf.filter(~pl.all_horizontal(pl.all().exclude(POLARS_ROW_COLUMN).is_null()))
+    
+    if options.get('fill_missing'):
+        missing_strategy = options.get('missing_strategy', 'median')
+        missing_text_strategy = options.get('missing_text_strategy', 'Unknown')
+        
+        drop_subset = []
+        if missing_text_strategy == 'drop_rows':
+            drop_subset.extend(text_cols)
+        if missing_strategy == 'drop_rows':
+            drop_subset.extend(num_cols)
+        if drop_subset:
+            lf = lf.drop_nulls(subset=drop_subset)
+        
+        exprs = []
+        if missing_text_strategy != 'drop_rows':
+            for col in text_cols:
+                if col not in has_nulls:
+                    continue
+                expr = pl.col(col)
+                if missing_text_strategy == 'most_frequent':
+                    # Ties go to the value seen first, as with value_counts().index[0] in pandas
+                    present = pl.col(col).drop_nulls()
+                    expr = expr.fill_null(
+                        present.unique(maintain_order=True).get(present.unique_counts().arg_max())
+                    )
+                exprs.append(expr.fill_null('Unknown'))
+        if missing_strategy != 'drop_rows':
+            for col in num_cols:
+                if col not in has_nulls:
+                    continue
+                if missing_strategy == 'median':
+                    fill_value = pl.col(col).median()
+                elif missing_strategy == 'mean':
+                    fill_value = pl.col(col).mean()
+                else:
+                    fill_value = 0
+                exprs.append(pl.col(col).fill_null(fill_value))
+        if exprs:
+            lf = lf.with_columns(exprs)
+    
+    if options.get('remove_duplicates'):
+        lf = lf.unique(subset=list(df.columns), keep='first', maintain_order=True)
+    
+    cleaned_df = lf.collect().to_pandas()
+    cleaned_df.index = df.index.take(cleaned_df.pop(POLARS_ROW_COLUMN).to_numpy())
+    return cleaned_df
+
+def clean_dataframe(df, options):
+    """Apply cleaning operations to dataframe based on user selections"""
+    if not has_cleaning_steps(options):
+        return df
+    
+    # Row-level steps run in Polars when it is installed and every column maps
+    # cleanly (numeric or plain text); otherwise, or on any failure, in pandas
+    cleaned_df = None
+    row_steps = any(options.get(key) for key in ('remove_empty', 'fill_missing', 'remove_duplicates'))
+    if row_steps and pl is not None and POLARS_ROW_COLUMN not in df.columns and not df.columns.duplicated().any() and all(
+        pd.api.types.is_numeric_dtype(dtype) or dtype == object for dtype in df.dtypes
+    ):
+        try:
+            cleaned_df = _clean_rows_polars(df, options)
+        except Exception:
+            cleaned_df = None
+    if cleaned_df is None:
+        cleaned_df = _clean_rows_pandas(df, options)
+    
     # Apply column renaming
     if options.get('apply_column_rename'):
         # Apply suggested clean names
-        new_columns = {}
-        for col in cleaned_df.columns:
-            clean_name = col.strip().replace(' ', '_').replace('-', '_').lower()
-            clean_name = ''.join(c for c in clean_name if c.isalnum() or c == '_')
-            new_columns[col] = clean_name
-        cleaned_df = cleaned_df.rename(columns=new_columns)
+        cleaned_df = cleaned_df.rename(columns=clean_column_name)
     
     # Parse dates
     if options.get('parse_dates') and options.get('date_columns'):
-        for col in options['date_columns']:
+        date_columns = [col for col in options['date_columns'] if col in cleaned_df.columns]
+        parsed = parse_datetime_columns_polars(cleaned_df, date_columns)
+        for col in date_columns:
             try:
-                if col in cleaned_df.columns:
-                    cleaned_df[col] = pd.to_datetime(cleaned_df[col], errors='coerce')
+                cleaned_df[col] = parsed[col] if col in parsed else parse_datetime_column(cleaned_df[col])
             except Exception as e:
                 st.warning(f"Could not parse dates in column {col}: {str(e)}")
     
     # Optimize data types
     if options.get('optimize_types'):
-        for col in cleaned_df.columns:
-            if cleaned_df[col].dtype == 'object':
-                # Try to convert to numeric
-                try:
-                    numeric_col = pd.to_numeric(cleaned_df[col], errors='raise')
-                    # Check if it's actually integer
-                    if numeric_col.equals(numeric_col.astype('int64')):
-                        cleaned_df[col] = numeric_col.astype('int64')
-                    else:
-                        cleaned_df[col] = numeric_col
-                except:
-                    # Check if it should be categorical
-                    if cleaned_df[col].nunique() / len(cleaned_df) < 0.1:  # Less than 10% unique values
-                        cleaned_df[col] = cleaned_df[col].astype('category')
+        text_cols = cleaned_df.select_dtypes(include=['object']).columns
+        unique_counts = cleaned_df[text_cols].nunique()
+        for col in text_cols:
+            try:
+                # Whole numbers shrink to the smallest int dtype; decimals stay float64
+                cleaned_df[col] = pd.to_numeric(cleaned_df[col], errors='raise', downcast='integer')
+            except (ValueError, TypeError):
+                # Check if it should be categorical
+                if len(cleaned_df) and unique_counts[col] / len(cleaned_df) < 0.1:  # Less than 10% unique values
+                    cleaned_df[col] = cleaned_df[col].astype('category')
     
     return cleaned_df
 
+def categorize_text_columns(df, max_unique_ratio=0.5):
+    """Store low-cardinality text columns as category dtype for cheaper filtering"""
+    if df.empty:
+        return df
+    
+    for col in df.select_dtypes(include=['object']).columns:
+        if df[col].nunique() / len(df) < max_unique_ratio:
+            df[col] = df[col].astype('category')
+    
+    return df
+
+def downcast_numeric_columns(df):
+    """Shrink numeric columns to the smallest dtype that holds their values"""
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    # Floats are only narrowed when float32 round-trips every value exactly,
+    # so aggregations over prices and other decimals keep full precision
+    for col in df.select_dtypes(include=['floating']).columns:
+        downcast_col = pd.to_numeric(df[col], downcast='float')
+        if downcast_col.dtype != df[col].dtype and np.array_equal(
+            downcast_col.to_numpy(np.float64), df[col].to_numpy(np.float64), equal_nan=True
+        ):
+            df[col] = downcast_col
+    
+    return df
+
+def optimize_for_storage(df):
+    """Compact dtypes of a data source before it is saved"""
+    return downcast_numeric_columns(categorize_text_columns(df))
+
+def load_upload(file_bytes, parser, preview_mode):
+    """Frame shown in the upload tab: a row prefix for large files, else the full parse"""
+    return load_csv_preview(file_bytes) if preview_mode else load_csv(file_bytes, parser)
+
+@st.cache_data(show_spinner=False)
+def summarize_upload(file_bytes, parser, preview_mode):
+    """Missing-value total for an uploaded file, computed once per file"""
+    return {'missing': int(DataStorageManager.count_missing(load_upload(file_bytes, parser, preview_mode)).sum())}
+
+@st.cache_data(show_spinner=False)
+def count_upload_duplicates(file_bytes, parser, preview_mode):
+    """Duplicate-row count for an uploaded file, computed once per file"""
+    return int(load_upload(file_bytes, parser, preview_mode).duplicated().sum())
+
+@st.cache_data(show_spinner=False)
+def preview_cleaning(file_bytes, parser, preview_mode, options):
+    """Cleaned copy of an upload for the before/after preview, cached per option set"""
+    return clean_dataframe(load_upload(file_bytes, parser, preview_mode), options)
+
+def get_source_summary(name, df):
+    """Return cached summary statistics for a saved data source"""
+    if 'source_summaries' not in st.session_state:
+        st.session_state.source_summaries = {}
+    
+    summary = st.session_state.source_summaries.get(name)
+    
+    # Recompute only when the data source has been replaced
+    if summary is None or summary['frame'] is not df:
+        missing_by_col = DataStorageManager.count_missing(df)
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        text_cols = df.select_dtypes(include=['object', 'category']).columns
+        summary = {
+            'frame': df,
+            'missing_by_col': missing_by_col,
+            'missing_total': int(missing_by_col.sum()),
+            'numeric_cols': numeric_cols,
+            'column_info': pd.DataFrame({
+                'Type': df.dtypes.astype(str),
+                'Non-null': len(df) - missing_by_col,
+                'Unique': df[text_cols].nunique().reindex(df.columns).astype('Int64')
+            }),
+            'duplicates': None,  # hashes every row, so computed on request
+            'describe': df[numeric_cols].describe() if len(numeric_cols) > 0 else None
+        }
+        st.session_state.source_summaries[name] = summary
+    
+    return summary
+
+def source_column_stats(name, df):
+    """Per-column describe() table, computed separately per dtype group and cached"""
+    summary = get_source_summary(name, df)
+    
+    if summary.get('column_stats') is None:
+        parts = []
+        if len(summary['numeric_cols']) > 0:
+            parts.append(summary['describe'])
+        other = df.select_dtypes(exclude=[np.number])
+        if len(other.columns) > 0:
+            # include='all' keeps text and bool columns next to any datetime ones,
+            # which the default would drop
+            parts.append(other.describe(include='all'))
+        stats = pd.concat(parts, axis=1) if parts else pd.DataFrame()
+        summary['column_stats'] = stats.reindex(columns=df.columns).transpose()
+    
+    return summary['column_stats']
+
+def source_csv_bytes(name, df):
+    """Encode a data source as CSV once and reuse the bytes on later downloads"""
+    summary = get_source_summary(name, df)
+    
+    if summary.get('csv_bytes') is None:
+        # Writing to a binary buffer avoids building the whole CSV as one str first
+        buffer = io.BytesIO()
+        try:
+            if pl is None:
+                raise ImportError("polars not installed")
+            # Polars spells dates, timestamps and booleans differently from to_csv,
+            # so only frames without them go through its multithreaded writer
+            if len(df.select_dtypes(include=['datetime', 'datetimetz', 'timedelta', 'bool']).columns):
+                raise TypeError("columns written differently by polars")
+            pl.from_pandas(df).write_csv(buffer)
+        except Exception:
+            buffer = io.BytesIO()
+            df.to_csv(buffer, index=False)
+        summary['csv_bytes'] = buffer.getvalue()
+    
+    return summary['csv_bytes']
+
 def main():
     st.title("📁 Data Sources Management")
     st.markdown("Upload and manage your data sources for dashboard creation")
     
-    # Initialize session state
+    # Initialize session state. Data sources are kept as live DataFrames:
+    # session state stays in server memory between reruns and is never
+    # pickled, so serializing frames would only add a decode on each access
     if 'data_sources' not in st.session_state:
         st.session_state.data_sources = {}
     
@@ -133,11 +541,22 @@ def main():
             type=['csv'],
             help="Upload CSV files to use as data sources for your dashboards"
         )
+        parser = st.selectbox(
+            "CSV Parser",
+            csv_parsers(),
+            help="polars and pyarrow are multithreaded; cudf parses on an NVIDIA GPU when installed"
+        )
         
         if uploaded_file is not None:
             try:
-                # Read the file
-                df = pd.read_csv(uploaded_file)
+                # Read the file; large files are previewed and parsed in full on save
+                preview_mode = uploaded_file.size > LARGE_UPLOAD_BYTES
+                df = load_upload(uploaded_file.getvalue(), parser, preview_mode)
+                if preview_mode:
+                    st.info(f"Large file: previewing the first {PREVIEW_ROWS:,} rows. The full file is parsed when you save it.")
+                
+                # One null scan feeds the metric and the cleaning comparison
+                original_missing = summarize_upload(uploaded_file.getvalue(), parser, preview_mode)['missing']
                 
                 col1, col2 = st.columns([2, 1])
                 
@@ -150,11 +569,11 @@ def main():
                     info_col1, info_col2, info_col3 = st.columns(3)
                     
                     with info_col1:
-                        st.metric("Rows", len(df))
+                        st.metric("Rows", f"{len(df):,}+" if preview_mode else len(df))
                     with info_col2:
                         st.metric("Columns", len(df.columns))
                     with info_col3:
-                        st.metric("Missing Values", df.isnull().sum().sum())
+                        st.metric("Missing Values", original_missing)
                 
                 with col2:
                     st.subheader("Data Validation")
@@ -175,6 +594,12 @@ def main():
                             st.write(suggestion)
                 
                 # Enhanced Data cleaning options with preview
+                # Defaults for selections whose widgets are only shown conditionally
+                fill_missing = remove_duplicates = remove_empty = False
+                parse_dates = optimize_types = apply_column_rename = False
+                missing_strategy, missing_text_strategy = 'median', 'Unknown'
+                date_columns = []
+                
                 with st.expander("🧹 Data Cleaning & Transformation", expanded=True):
                     st.markdown("### Preview and clean your data before saving")
                     
@@ -197,7 +622,7 @@ def main():
                             st.write("**Duplicate Rows:**")
                             remove_duplicates = st.checkbox("Remove duplicate rows")
                             if remove_duplicates:
-                                duplicate_count = df.duplicated().sum()
+                                duplicate_count = count_upload_duplicates(uploaded_file.getvalue(), parser, preview_mode)
                                 if duplicate_count > 0:
                                     st.info(f"Found {duplicate_count} duplicate rows")
                                 else:
@@ -220,18 +645,21 @@ def main():
                             if remove_outliers:
                                 outlier_method = st.selectbox("Method", ["IQR", "Z-score"])
                                 outlier_threshold = st.slider("Threshold", 1.0, 3.0, 1.5)
+                                outlier_mask = flag_outliers(df, outlier_method, outlier_threshold)
+                                outlier_rows = int(outlier_mask.any(axis=1).sum())
+                                if outlier_rows > 0:
+                                    per_column = outlier_mask.sum()
+                                    per_column = per_column[per_column > 0]
+                                    st.info(f"Flagged {outlier_rows} rows with outliers in: {', '.join(map(str, per_column.index))}")
+                                else:
+                                    st.success("No outliers found")
                     
                     with clean_tab2:
                         st.subheader("Rename Columns")
                         st.write("Clean up column names for better usability")
                         
                         # Show current column names and suggested improvements
-                        col_rename_data = []
-                        for col in df.columns:
-                            # Suggest cleaned column name
-                            clean_name = col.strip().replace(' ', '_').replace('-', '_').lower()
-                            clean_name = ''.join(c for c in clean_name if c.isalnum() or c == '_')
-                            col_rename_data.append([col, clean_name])
+                        col_rename_data = [[col, clean_column_name(col)] for col in df.columns]
                         
                         if col_rename_data:
                             rename_df = pd.DataFrame(col_rename_data, columns=["Original Name", "Suggested Name"])
@@ -251,20 +679,7 @@ def main():
                         for col in df.columns:
                             if df[col].dtype == 'object':
                                 sample_values = df[col].dropna().head(10).astype(str)
-                                date_like_patterns = 0
-                                
-                                for value in sample_values:
-                                    # Check common date patterns
-                                    import re
-                                    patterns = [
-                                        r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-                                        r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-                                        r'\d{2}-\d{2}-\d{4}',  # MM-DD-YYYY
-                                        r'\w+ \d{1,2}, \d{4}', # Month DD, YYYY
-                                    ]
-                                    
-                                    if any(re.search(pattern, value) for pattern in patterns):
-                                        date_like_patterns += 1
+                                date_like_patterns = int(sample_values.str.contains(DATE_PATTERN).sum())
                                 
                                 confidence = date_like_patterns / len(sample_values) if len(sample_values) > 0 else 0
                                 if confidence > 0.5:  # More than 50% look like dates
@@ -294,19 +709,21 @@ def main():
                         st.subheader("Preview Cleaned Data")
                         
                         # Build cleaning options based on user selections
-                        cleaning_options = {
-                            'fill_missing': fill_missing if 'fill_missing' in locals() else False,
-                            'remove_duplicates': remove_duplicates if 'remove_duplicates' in locals() else False,
-                            'remove_empty': remove_empty if 'remove_empty' in locals() else False,
-                            'parse_dates': parse_dates if 'parse_dates' in locals() else False,
-                            'date_columns': date_columns if 'date_columns' in locals() else [],
-                            'optimize_types': optimize_types if 'optimize_types' in locals() else False,
-                            'apply_column_rename': apply_column_rename if 'apply_column_rename' in locals() else False
-                        }
+                        cleaning_options = build_cleaning_options(
+                            fill_missing=fill_missing,
+                            missing_strategy=missing_strategy,
+                            missing_text_strategy=missing_text_strategy,
+                            remove_duplicates=remove_duplicates,
+                            remove_empty=remove_empty,
+                            parse_dates=parse_dates,
+                            date_columns=date_columns,
+                            optimize_types=optimize_types,
+                            apply_column_rename=apply_column_rename
+                        )
                         
                         # Show before/after comparison
-                        if any(cleaning_options.values()):
-                            preview_df = clean_dataframe(df.copy(), cleaning_options)
+                        if has_cleaning_steps(cleaning_options):
+                            preview_df = preview_cleaning(uploaded_file.getvalue(), parser, preview_mode, cleaning_options)
                             
                             st.write("**Before/After Comparison:**")
                             comparison_col1, comparison_col2 = st.columns(2)
@@ -315,20 +732,21 @@ def main():
                                 st.write("**Original Data:**")
                                 st.dataframe(df.head(), use_container_width=True)
                                 st.write(f"Shape: {df.shape}")
-                                st.write(f"Missing values: {df.isnull().sum().sum()}")
+                                st.write(f"Missing values: {original_missing}")
                             
                             with comparison_col2:
                                 st.write("**Cleaned Data:**")
                                 st.dataframe(preview_df.head(), use_container_width=True)
                                 st.write(f"Shape: {preview_df.shape}")
-                                st.write(f"Missing values: {preview_df.isnull().sum().sum()}")
+                                cleaned_missing = int(DataStorageManager.count_missing(preview_df).sum())
+                                st.write(f"Missing values: {cleaned_missing}")
                                 
                                 # Show changes summary
                                 changes = []
                                 if df.shape[0] != preview_df.shape[0]:
                                     changes.append(f"Rows: {df.shape[0]} → {preview_df.shape[0]}")
-                                if df.isnull().sum().sum() != preview_df.isnull().sum().sum():
-                                    changes.append(f"Missing values: {df.isnull().sum().sum()} → {preview_df.isnull().sum().sum()}")
+                                if original_missing != cleaned_missing:
+                                    changes.append(f"Missing values: {original_missing} → {cleaned_missing}")
                                 
                                 if changes:
                                     st.success("Changes: " + ", ".join(changes))
@@ -342,16 +760,6 @@ def main():
                     with apply_col1:
                         if st.button("🧹 Apply All Selected Cleaning", type="primary"):
                             try:
-                                cleaning_options = {
-                                    'fill_missing': fill_missing if 'fill_missing' in locals() else False,
-                                    'remove_duplicates': remove_duplicates if 'remove_duplicates' in locals() else False,
-                                    'remove_empty': remove_empty if 'remove_empty' in locals() else False,
-                                    'parse_dates': parse_dates if 'parse_dates' in locals() else False,
-                                    'date_columns': date_columns if 'date_columns' in locals() else [],
-                                    'optimize_types': optimize_types if 'optimize_types' in locals() else False,
-                                    'apply_column_rename': apply_column_rename if 'apply_column_rename' in locals() else False
-                                }
-                                
                                 df = clean_dataframe(df, cleaning_options)
                                 st.success("Data cleaning applied successfully!")
                                 st.rerun()
@@ -361,7 +769,7 @@ def main():
                     with apply_col2:
                         if st.button("↩️ Reset to Original", type="secondary"):
                             # Reset df to original uploaded state
-                            df = pd.read_csv(uploaded_file)
+                            df = load_upload(uploaded_file.getvalue(), parser, preview_mode)
                             st.info("Data reset to original state")
                 
                 # Save data source
@@ -377,15 +785,18 @@ def main():
                 
                 with col2:
                     if st.button("💾 Save Data Source", type="primary"):
+                        if preview_mode:
+                            with st.spinner("Reading full file..."):
+                                df = load_csv(uploaded_file.getvalue(), parser)
                         if data_source_name:
                             if data_source_name in st.session_state.data_sources:
                                 if st.checkbox("Overwrite existing data source"):
-                                    st.session_state.data_sources[data_source_name] = df
+                                    st.session_state.data_sources[data_source_name] = optimize_for_storage(df)
                                     st.success(f"Data source '{data_source_name}' updated!")
                                 else:
                                     st.error("Data source name already exists!")
                             else:
-                                st.session_state.data_sources[data_source_name] = df
+                                st.session_state.data_sources[data_source_name] = optimize_for_storage(df)
                                 st.success(f"Data source '{data_source_name}' saved!")
                         else:
                             st.error("Please enter a data source name!")
@@ -416,6 +827,7 @@ def main():
                     with col3:
                         if st.button("🗑️ Delete", key=f"delete_{i}", type="secondary"):
                             del st.session_state.data_sources[name]
+                            st.session_state.get('source_summaries', {}).pop(name, None)
                             st.success(f"Data source '{name}' deleted!")
                             st.rerun()
                     
@@ -426,8 +838,7 @@ def main():
                         
                         # Column statistics
                         st.subheader("Column Statistics")
-                        stats_df = df.describe(include='all').transpose()
-                        st.dataframe(stats_df, use_container_width=True)
+                        st.dataframe(source_column_stats(name, df), use_container_width=True)
     
     with tab3:
         st.header("📊 Data Preview & Analysis")
@@ -440,6 +851,7 @@ def main():
             
             if selected_source:
                 df = st.session_state.data_sources[selected_source]
+                summary = get_source_summary(selected_source, df)
                 
                 # Data overview
                 overview_col1, overview_col2, overview_col3, overview_col4 = st.columns(4)
@@ -449,35 +861,26 @@ def main():
                 with overview_col2:
                     st.metric("Total Columns", len(df.columns))
                 with overview_col3:
-                    st.metric("Numeric Columns", len(df.select_dtypes(include=[np.number]).columns))
+                    st.metric("Numeric Columns", len(summary['numeric_cols']))
                 with overview_col4:
-                    st.metric("Missing Values", df.isnull().sum().sum())
+                    st.metric("Missing Values", summary['missing_total'])
                 
                 # Data sample and column info
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
                     st.subheader("Data Sample")
-                    sample_size = st.slider("Sample Size", 5, min(100, len(df)), 10)
-                    st.dataframe(df.head(sample_size), use_container_width=True)
+                    # Fixed slice in a scrollable grid; scrolling happens in the browser without reruns
+                    st.dataframe(df.head(SAMPLE_ROWS), height=400, use_container_width=True)
                 
                 with col2:
                     st.subheader("Column Information")
-                    for col in df.columns:
-                        with st.container():
-                            st.write(f"**{col}**")
-                            st.write(f"Type: {df[col].dtype}")
-                            st.write(f"Non-null: {df[col].notna().sum()}")
-                            if df[col].dtype in ['object', 'category']:
-                                st.write(f"Unique: {df[col].nunique()}")
-                            st.divider()
+                    st.dataframe(summary['column_info'], use_container_width=True)
                 
                 # Quick statistics for numeric columns
-                numeric_cols = df.select_dtypes(include=[np.number]).columns
-                if len(numeric_cols) > 0:
+                if summary['describe'] is not None:
                     st.subheader("Numeric Column Statistics")
-                    stats_df = df[numeric_cols].describe()
-                    st.dataframe(stats_df, use_container_width=True)
+                    st.dataframe(summary['describe'], use_container_width=True)
                 
                 # Data quality issues
                 st.subheader("Data Quality Check")
@@ -485,7 +888,7 @@ def main():
                 
                 with quality_col1:
                     st.write("**Missing Values by Column:**")
-                    missing_data = df.isnull().sum()
+                    missing_data = summary['missing_by_col']
                     missing_data = missing_data[missing_data > 0]
                     if len(missing_data) > 0:
                         st.dataframe(missing_data.to_frame("Missing Count"), use_container_width=True)
@@ -494,8 +897,13 @@ def main():
                 
                 with quality_col2:
                     st.write("**Duplicate Rows:**")
-                    duplicates = df.duplicated().sum()
-                    if duplicates > 0:
+                    if summary['duplicates'] is None and st.button("🔍 Check for duplicates", key=f"dupes_{selected_source}"):
+                        summary['duplicates'] = int(df.duplicated().sum())
+                    
+                    duplicates = summary['duplicates']
+                    if duplicates is None:
+                        st.caption("Not checked yet")
+                    elif duplicates > 0:
                         st.warning(f"Found {duplicates} duplicate rows")
                     else:
                         st.success("No duplicate rows found!")
@@ -506,14 +914,12 @@ def main():
                 export_col1, export_col2 = st.columns(2)
                 
                 with export_col1:
-                    if st.button("📥 Download as CSV"):
-                        csv = df.to_csv(index=False)
-                        st.download_button(
-                            label="Download CSV",
-                            data=csv,
-                            file_name=f"{selected_source}.csv",
-                            mime="text/csv"
-                        )
+                    st.download_button(
+                        label="📥 Download as CSV",
+                        data=source_csv_bytes(selected_source, df),
+                        file_name=f"{selected_source}.csv",
+                        mime="text/csv"
+                    )
                 
                 with export_col2:
                     if st.button("📊 Create Dashboard"):
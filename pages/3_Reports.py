@@ -1,193 +1,444 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 import plotly.io as pio
 from datetime import datetime, timedelta
-import base64
 import io
 import json
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import tempfile
-import os
+import weakref
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None  # Multithreaded CSV writer; ships with streamlit
 
 st.set_page_config(page_title="Reports & Export", page_icon="📋", layout="wide")
 
-def create_chart_image(chart_config, data_source_df, format='png'):
-    """Create a chart image from chart configuration"""
+# Plotly Express builders for the x/y chart types; pie charts map columns differently
+_PX_BUILDERS = {
+    "Line Chart": px.line,
+    "Bar Chart": px.bar,
+    "Scatter Plot": px.scatter,
+    "Area Chart": px.area,
+}
+
+# Embedded PDF charts are drawn 6 x 3.75 inches; rendering at 480 x 300 with
+# scale 1.5 gives 720 x 450 px (~120 dpi) instead of a full 800 x 500 export
+PDF_IMAGE_WIDTH = 480
+PDF_IMAGE_HEIGHT = 300
+PDF_IMAGE_SCALE = 1.5
+
+# Session-state caches whose entries start with weak references to the frames they were built from
+REPORT_CACHES = ('report_chart_data', 'report_chart_figures', 'report_chart_images')
+
+@st.cache_resource(show_spinner=False)
+def pdf_table_styles():
+    """PDF table styles, built once and shared by every table of every report"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    
+    return {
+        'report': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        'detail': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        'summary': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.lightyellow),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+    }
+
+@st.cache_resource(show_spinner=False)
+def start_image_server():
+    """Start one Kaleido browser process that every image export reuses"""
+    # Imported on first export rather than with the page
+    try:
+        import kaleido
+    except ImportError:
+        return False
+    
+    # Without a running sync server each pio.to_image call launches its own Chromium
+    if hasattr(kaleido, 'start_sync_server'):
+        try:
+            kaleido.start_sync_server()
+            return True
+        except Exception:
+            return False
+    return False
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def figure_to_image(fig_json, format='png', width=800, height=500, scale=1.0):
+    """Render a serialized figure to image bytes; repeat exports are served from cache"""
+    start_image_server()
+    return pio.to_image(pio.from_json(fig_json), format=format, width=width, height=height, scale=scale)
+
+def frame_to_csv_bytes(df):
+    """Encode a DataFrame as CSV bytes, through Arrow's C++ writer when available"""
+    buffer = io.BytesIO()
     try:
-        df = data_source_df.copy()
+        if pa is None:
+            raise ImportError("pyarrow not installed")
+        # Arrow formats timestamps, booleans and floats differently from to_csv,
+        # so only frames of integer and text columns go through its writer
+        if len(df.select_dtypes(include=['datetime', 'datetimetz', 'timedelta', 'bool', 'floating']).columns):
+            raise TypeError("columns written differently by pyarrow")
+        pacsv.write_csv(
+            pa.Table.from_pandas(df, preserve_index=False), buffer,
+            write_options=pacsv.WriteOptions(quoting_style='needed')
+        )
+    except Exception:
+        # Mixed-type object columns and the like go through pandas instead
+        buffer = io.BytesIO()
+        df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+def aggregates_by_x(chart_type, x_values):
+    """Whether a chart sums its y column per x category"""
+    if chart_type == "Scatter Plot":
+        return False
+    return pd.api.types.is_object_dtype(x_values.dtype) or isinstance(x_values.dtype, pd.CategoricalDtype)
+
+def sum_by_keys(df, keys, y_cols):
+    """Sum y columns per group, skipping the group sort when x is already ordered"""
+    # A single already-ascending key gives groups in sorted order without sorting
+    presorted = len(keys) == 1 and df[keys[0]].is_monotonic_increasing
+    return df.groupby(keys, observed=True, sort=not presorted)[y_cols].sum().reset_index()
+
+def chart_display_data(chart_config, data_source_df):
+    """Columns a chart plots, summed per category when the x-axis is categorical
+    
+    Results are kept in session state per data source frame, so the preview,
+    image exports, PDF report and CSV export of a chart share one groupby.
+    """
+    x_col = chart_config['x_column']
+    y_col = chart_config['y_column']
+    color_col = chart_config.get('color_column')
+    
+    if 'report_chart_data' not in st.session_state:
+        st.session_state.report_chart_data = {}
+    cache_key = (chart_config['data_source'], chart_config['type'], x_col, y_col, color_col)
+    cached = st.session_state.report_chart_data.get(cache_key)
+    
+    # Reuse only while the data source has not been replaced
+    if cached is not None and cached[0]() is data_source_df:
+        return cached[1]
+    
+    # Only the plotted columns are selected, so neither the groupby nor
+    # plotly touches the rest of the frame
+    keys = [x_col] + ([color_col] if color_col and color_col != x_col else [])
+    df = data_source_df[keys + ([y_col] if y_col not in keys else [])]
+    
+    if aggregates_by_x(chart_config['type'], df[x_col]):
+        df = sum_by_keys(df, keys, y_col)
+    
+    st.session_state.report_chart_data[cache_key] = (weakref.ref(data_source_df), df)
+    return df
+
+def prefetch_chart_display_data(charts, data_sources):
+    """Aggregate charts that share a data source and grouping in one groupby pass
+    
+    Charts grouped by the same x/color columns differ only in the summed y column,
+    so their sums are taken together and split into the chart_display_data cache.
+    """
+    if 'report_chart_data' not in st.session_state:
+        st.session_state.report_chart_data = {}
+    clusters = {}
+    for chart_config in charts.values():
+        df = data_sources.get(chart_config['data_source'])
         x_col = chart_config['x_column']
         y_col = chart_config['y_column']
         color_col = chart_config.get('color_column')
-        chart_type = chart_config['type']
-        title = chart_config['title']
-        
-        # Apply data aggregation for better visualization
-        if df[x_col].dtype == 'object' and chart_type != "Scatter Plot":
-            if color_col:
-                display_df = df.groupby([x_col, color_col])[y_col].sum().reset_index()
-            else:
-                display_df = df.groupby(x_col)[y_col].sum().reset_index()
-        else:
-            display_df = df
-        
-        # Create chart based on type
-        if chart_type == "Line Chart":
-            fig = px.line(display_df, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Bar Chart":
-            fig = px.bar(display_df, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Scatter Plot":
-            fig = px.scatter(display_df, x=x_col, y=y_col, color=color_col, title=title)
-        elif chart_type == "Pie Chart":
-            if color_col:
-                fig = px.pie(display_df, values=y_col, names=color_col, title=title)
-            else:
-                fig = px.pie(display_df, values=y_col, names=x_col, title=title)
-        elif chart_type == "Area Chart":
-            fig = px.area(display_df, x=x_col, y=y_col, color=color_col, title=title)
-        else:
+        if df is None or x_col not in df.columns or not aggregates_by_x(chart_config['type'], df[x_col]):
+            continue
+        keys = tuple([x_col] + ([color_col] if color_col and color_col != x_col else []))
+        cache_key = (chart_config['data_source'], chart_config['type'], x_col, y_col, color_col)
+        cached = st.session_state.report_chart_data.get(cache_key)
+        if y_col in keys or (cached is not None and cached[0]() is df):
+            continue
+        clusters.setdefault((chart_config['data_source'], keys), []).append((cache_key, y_col))
+    
+    for (source, keys), members in clusters.items():
+        if len(members) < 2:
+            continue
+        y_cols = list(dict.fromkeys(y_col for _, y_col in members))
+        df = data_sources[source]
+        keys = list(keys)
+        try:
+            grouped = sum_by_keys(df[keys + y_cols], keys, y_cols)
+        except Exception:
+            # Leave these charts to the per-chart groupby
+            continue
+        for cache_key, y_col in members:
+            st.session_state.report_chart_data[cache_key] = (weakref.ref(df), grouped[keys + [y_col]])
+
+def _build_fig(chart_type, display_df, x_col, y_col, color_col, title):
+    """Build the Plotly figure for one chart type"""
+    if chart_type == "Pie Chart":
+        fig = px.pie(display_df, values=y_col, names=color_col or x_col, title=title)
+    elif chart_type in _PX_BUILDERS:
+        fig = _PX_BUILDERS[chart_type](display_df, x=x_col, y=y_col, color=color_col, title=title)
+    else:
+        return None
+    
+    # Update layout for better export
+    fig.update_layout(
+        width=800,
+        height=500,
+        font=dict(size=12),
+        title_font_size=16,
+        showlegend=True
+    )
+    return fig
+
+def build_chart_figure(chart_config, data_source_df):
+    """Export figure for a chart configuration, built once per config and data source
+    
+    The returned figure is shared across reruns, previews and exports, so callers
+    must not modify it.
+    """
+    if 'report_chart_figures' not in st.session_state:
+        st.session_state.report_chart_figures = {}
+    cache_key = json.dumps(chart_config, sort_keys=True, default=str)
+    cached = st.session_state.report_chart_figures.get(cache_key)
+    
+    # Reuse only while the data source has not been replaced
+    if cached is not None and cached[0]() is data_source_df:
+        return cached[1]
+    
+    # Apply data aggregation for better visualization
+    display_df = chart_display_data(chart_config, data_source_df)
+    fig = _build_fig(
+        chart_config['type'],
+        display_df,
+        chart_config['x_column'],
+        chart_config['y_column'],
+        chart_config.get('color_column'),
+        chart_config['title']
+    )
+    
+    st.session_state.report_chart_figures[cache_key] = (weakref.ref(data_source_df), fig)
+    return fig
+
+def create_chart_image(chart_config, data_source_df, format='png', width=800, height=500, scale=1.0):
+    """Create a chart image from chart configuration"""
+    try:
+        fig = build_chart_figure(chart_config, data_source_df)
+        if fig is None:
             return None
         
-        # Update layout for better export
-        fig.update_layout(
-            width=800,
-            height=500,
-            font=dict(size=12),
-            title_font_size=16,
-            showlegend=True
-        )
-        
         # Convert to image
-        img_bytes = pio.to_image(fig, format=format, width=800, height=500)
-        return img_bytes
+        return figure_to_image(fig.to_json(), format=format, width=width, height=height, scale=scale)
         
     except Exception as e:
         st.error(f"Error creating chart image: {str(e)}")
         return None
 
-def generate_pdf_report(dashboard_name, dashboard_data, data_sources):
-    """Generate a PDF report from dashboard data"""
+def render_chart_images(charts, data_sources, format='png', width=800, height=500, scale=1.0):
+    """Render every chart of a dashboard to image bytes through the shared Kaleido server"""
+    start_image_server()
+    prefetch_chart_display_data(charts, data_sources)
+    images = {}
+    for chart_id, chart_config in charts.items():
+        df = data_sources.get(chart_config['data_source'])
+        if df is None:
+            continue
+        try:
+            fig = build_chart_figure(chart_config, df)
+            if fig is not None:
+                images[chart_id] = figure_to_image(fig.to_json(), format=format, width=width, height=height, scale=scale)
+        except Exception:
+            # A chart that cannot be rendered is still listed with its details
+            continue
+    return images
+
+def generate_pdf_report(dashboard_name, dashboard_data, data_sources, include_charts=False, chart_images=None):
+    """Generate a PDF report from dashboard data
+    
+    chart_images maps chart ids to already rendered images; without it the
+    images are rendered here when include_charts is set.
+    """
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            doc = SimpleDocTemplate(tmp_file.name, pagesize=A4)
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                spaceAfter=30,
-                textColor=colors.HexColor('#1f77b4')
-            )
-            story.append(Paragraph(f"Dashboard Report: {dashboard_name}", title_style))
-            story.append(Spacer(1, 20))
+        # ReportLab is imported on first use so the page itself loads without it
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table
+        
+        table_styles = pdf_table_styles()
+        charts = dashboard_data.get('charts', {})
+        used_sources = frozenset(chart['data_source'] for chart in charts.values())
+        
+        # Render all chart images up front, before the story is assembled
+        if chart_images is None:
+            chart_images = render_chart_images(
+                charts, data_sources,
+                width=PDF_IMAGE_WIDTH, height=PDF_IMAGE_HEIGHT, scale=PDF_IMAGE_SCALE
+            ) if include_charts else {}
+        
+        # Build the PDF in memory; ReportLab accepts any file-like target
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4)
+        story = []
+        styles = getSampleStyleSheet()
+        
+        # Title
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            textColor=colors.HexColor('#1f77b4')
+        )
+        story.append(Paragraph(f"Dashboard Report: {dashboard_name}", title_style))
+        story.append(Spacer(1, 20))
+        
+        # Report metadata
+        report_info = [
+            ['Report Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
+            ['Dashboard Name:', dashboard_name],
+            ['Number of Charts:', str(len(charts))],
+            ['Data Sources Used:', ', '.join(used_sources)]
+        ]
+        
+        report_table = Table(report_info, colWidths=[2*inch, 4*inch])
+        report_table.setStyle(table_styles['report'])
+        story.append(report_table)
+        story.append(Spacer(1, 30))
+        
+        # Charts section
+        story.append(Paragraph("Charts and Visualizations", styles['Heading2']))
+        story.append(Spacer(1, 20))
+        
+        for chart_id, chart_config in charts.items():
+            # Chart title
+            story.append(Paragraph(chart_config['title'], styles['Heading3']))
+            story.append(Spacer(1, 10))
             
-            # Report metadata
-            report_info = [
-                ['Report Generated:', datetime.now().strftime('%Y-%m-%d %H:%M:%S')],
-                ['Dashboard Name:', dashboard_name],
-                ['Number of Charts:', str(len(dashboard_data.get('charts', {})))],
-                ['Data Sources Used:', ', '.join(set(chart['data_source'] for chart in dashboard_data.get('charts', {}).values()))]
+            # Chart details
+            chart_details = [
+                ['Chart Type:', chart_config['type']],
+                ['Data Source:', chart_config['data_source']],
+                ['X-Axis:', chart_config['x_column']],
+                ['Y-Axis:', chart_config['y_column']],
             ]
             
-            report_table = Table(report_info, colWidths=[2*inch, 4*inch])
-            report_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            story.append(report_table)
-            story.append(Spacer(1, 30))
+            if chart_config.get('color_column'):
+                chart_details.append(['Color By:', chart_config['color_column']])
             
-            # Charts section
-            story.append(Paragraph("Charts and Visualizations", styles['Heading2']))
-            story.append(Spacer(1, 20))
-            
-            for chart_id, chart_config in dashboard_data.get('charts', {}).items():
-                # Chart title
-                story.append(Paragraph(chart_config['title'], styles['Heading3']))
+            if chart_id in chart_images:
+                story.append(Image(io.BytesIO(chart_images[chart_id]), width=6*inch, height=3.75*inch))
                 story.append(Spacer(1, 10))
+            
+            detail_table = Table(chart_details, colWidths=[1.5*inch, 3*inch])
+            detail_table.setStyle(table_styles['detail'])
+            story.append(detail_table)
+            story.append(Spacer(1, 20))
+        
+        # Data summary section
+        story.append(Paragraph("Data Summary", styles['Heading2']))
+        story.append(Spacer(1, 20))
+        
+        for source_name, df in data_sources.items():
+            if source_name in used_sources:
+                story.append(Paragraph(f"Data Source: {source_name}", styles['Heading3']))
                 
-                # Chart details
-                chart_details = [
-                    ['Chart Type:', chart_config['type']],
-                    ['Data Source:', chart_config['data_source']],
-                    ['X-Axis:', chart_config['x_column']],
-                    ['Y-Axis:', chart_config['y_column']],
-                ]
+                # Numeric count from the dtype series; nulls summed in one NumPy reduction
+                numeric_count = int(df.dtypes.map(pd.api.types.is_numeric_dtype).sum())
+                missing_total = int(df.isna().to_numpy().sum())
                 
-                if chart_config.get('color_column'):
-                    chart_details.append(['Color By:', chart_config['color_column']])
+                summary_data = [
+                    ['Total Rows:', str(len(df))],
+                    ['Total Columns:', str(len(df.columns))],
+                    ['Numeric Columns:', str(numeric_count)],
+                    ['Missing Values:', str(missing_total)],
+                ]
                 
-                detail_table = Table(chart_details, colWidths=[1.5*inch, 3*inch])
-                detail_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-                    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                story.append(detail_table)
-                story.append(Spacer(1, 20))
-            
-            # Data summary section
-            story.append(Paragraph("Data Summary", styles['Heading2']))
-            story.append(Spacer(1, 20))
-            
-            for source_name, df in data_sources.items():
-                if any(chart['data_source'] == source_name for chart in dashboard_data.get('charts', {}).values()):
-                    story.append(Paragraph(f"Data Source: {source_name}", styles['Heading3']))
-                    
-                    summary_data = [
-                        ['Total Rows:', str(len(df))],
-                        ['Total Columns:', str(len(df.columns))],
-                        ['Numeric Columns:', str(len(df.select_dtypes(include=['number']).columns))],
-                        ['Missing Values:', str(df.isnull().sum().sum())],
-                    ]
-                    
-                    summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
-                    summary_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, -1), colors.lightyellow),
-                        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, -1), 9),
-                        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                    ]))
-                    story.append(summary_table)
-                    story.append(Spacer(1, 15))
-            
-            # Build PDF
-            doc.build(story)
-            
-            # Read the file content
-            with open(tmp_file.name, 'rb') as f:
-                pdf_content = f.read()
-            
-            # Clean up
-            os.unlink(tmp_file.name)
-            
-            return pdf_content
+                summary_table = Table(summary_data, colWidths=[2*inch, 2*inch])
+                summary_table.setStyle(table_styles['summary'])
+                story.append(summary_table)
+                story.append(Spacer(1, 15))
+        
+        # Build PDF
+        doc.build(story)
+        
+        return buffer.getvalue()
             
     except Exception as e:
         st.error(f"Error generating PDF: {str(e)}")
         return None
 
+def cached_pdf_report(dashboard_name, dashboard_data, data_sources, include_charts=False):
+    """PDF report bytes; chart images are re-rendered only when the charts or their data change
+    
+    The story itself is rebuilt on every call so its generation time is current.
+    """
+    chart_images = {}
+    if include_charts:
+        if 'report_chart_images' not in st.session_state:
+            st.session_state.report_chart_images = {}
+        charts = dashboard_data.get('charts', {})
+        cache_key = json.dumps(charts, sort_keys=True, default=str)
+        used_sources = sorted({chart['data_source'] for chart in charts.values()})
+        frames = [data_sources[source] for source in used_sources if source in data_sources]
+        cached = st.session_state.report_chart_images.get(cache_key)
+        
+        # Reuse only while none of the dashboard's data sources has been replaced
+        if cached is not None and len(cached[0]) == len(frames) and all(ref() is f for ref, f in zip(cached[0], frames)):
+            chart_images = cached[1]
+        else:
+            try:
+                chart_images = render_chart_images(
+                    charts, data_sources,
+                    width=PDF_IMAGE_WIDTH, height=PDF_IMAGE_HEIGHT, scale=PDF_IMAGE_SCALE
+                )
+            except Exception as e:
+                st.error(f"Error generating PDF: {str(e)}")
+                return None
+            st.session_state.report_chart_images[cache_key] = (tuple(weakref.ref(f) for f in frames), chart_images)
+    
+    return generate_pdf_report(dashboard_name, dashboard_data, data_sources,
+                               include_charts=include_charts, chart_images=chart_images)
+
+def prune_report_caches(data_sources):
+    """Drop cached report entries built from frames that are no longer data sources
+    
+    Entries only hold weak references to their frames, but figures and
+    aggregates still copy the data, so stale ones are removed on each run.
+    """
+    live = {id(df) for df in data_sources.values()}
+    for cache_name in REPORT_CACHES:
+        cache = st.session_state.get(cache_name)
+        if not cache:
+            continue
+        stale = []
+        for key, (refs, _) in cache.items():
+            refs = refs if isinstance(refs, tuple) else (refs,)
+            if any(ref() is None or id(ref()) not in live for ref in refs):
+                stale.append(key)
+        for key in stale:
+            del cache[key]
+
 def main():
     st.title("📋 Reports & Export")
     st.markdown("Generate and export reports from your dashboards")
@@ -197,6 +448,7 @@ def main():
         st.session_state.dashboards = {}
     if 'data_sources' not in st.session_state:
         st.session_state.data_sources = {}
+    prune_report_caches(st.session_state.data_sources)
     
     if not st.session_state.dashboards:
         st.warning("⚠️ No dashboards available. Please create a dashboard first!")
@@ -219,13 +471,13 @@ def main():
         if selected_dashboard:
             dashboard_data = st.session_state.dashboards[selected_dashboard]
             charts = dashboard_data.get('charts', {})
+            data_sources_used = frozenset(chart['data_source'] for chart in charts.values())
             
             # Dashboard summary
             col1, col2, col3 = st.columns(3)
             with col1:
                 st.metric("Total Charts", len(charts))
             with col2:
-                data_sources_used = set(chart['data_source'] for chart in charts.values())
                 st.metric("Data Sources", len(data_sources_used))
             with col3:
                 st.metric("Created", dashboard_data.get('created', 'Unknown')[:10])
@@ -258,11 +510,12 @@ def main():
                 
                 # Show dashboard preview
                 if charts:
-                    st.write(f"**{len(charts)} charts** will be included:")
-                    for chart_id, chart_config in list(charts.items())[:3]:
-                        st.write(f"• {chart_config['title']}")
+                    # One markdown element instead of one st.write per chart
+                    preview_lines = [f"**{len(charts)} charts** will be included:"]
+                    preview_lines += [f"- {chart_config['title']}" for chart_config in list(charts.values())[:3]]
                     if len(charts) > 3:
-                        st.write(f"• ... and {len(charts) - 3} more")
+                        preview_lines.append(f"- ... and {len(charts) - 3} more")
+                    st.markdown("\n".join(preview_lines))
                 else:
                     st.info("No charts in this dashboard")
             
@@ -276,10 +529,11 @@ def main():
             with export_col1:
                 if st.button("📄 Generate PDF Report", type="primary"):
                     with st.spinner("Generating PDF report..."):
-                        pdf_content = generate_pdf_report(
+                        pdf_content = cached_pdf_report(
                             selected_dashboard,
                             dashboard_data,
-                            st.session_state.data_sources
+                            st.session_state.data_sources,
+                            include_charts=include_charts
                         )
                         
                         if pdf_content:
@@ -295,19 +549,22 @@ def main():
             
             with export_col2:
                 if st.button("📊 Export Dashboard Data"):
-                    # Compile all data used in dashboard
-                    dashboard_data_combined = pd.DataFrame()
-                    
-                    for chart_config in charts.values():
-                        data_source = chart_config['data_source']
-                        if data_source in st.session_state.data_sources:
-                            df = st.session_state.data_sources[data_source]
-                            if dashboard_data_combined.empty:
-                                dashboard_data_combined = df.copy()
-                            # Could merge or append data from different sources
+                    # Compile all data used in dashboard, each source once
+                    frames = [
+                        st.session_state.data_sources[source]
+                        for source in sorted(data_sources_used)
+                        if source in st.session_state.data_sources
+                    ]
+                    if len(frames) > 1:
+                        dashboard_data_combined = pd.concat(frames, ignore_index=True)
+                    elif frames:
+                        # A single source is exported as-is, without a copy
+                        dashboard_data_combined = frames[0]
+                    else:
+                        dashboard_data_combined = pd.DataFrame()
                     
                     if not dashboard_data_combined.empty:
-                        csv = dashboard_data_combined.to_csv(index=False)
+                        csv = frame_to_csv_bytes(dashboard_data_combined)
                         st.download_button(
                             label="📥 Download Data CSV",
                             data=csv,
@@ -359,33 +616,9 @@ def main():
                 # Show chart preview
                 st.subheader("Chart Preview")
                 try:
-                    # Create and display the chart
-                    display_df = df.copy()
-                    x_col = chart_config['x_column']
-                    y_col = chart_config['y_column']
-                    color_col = chart_config.get('color_column')
-                    
-                    if df[x_col].dtype == 'object' and chart_config['type'] != "Scatter Plot":
-                        if color_col:
-                            display_df = df.groupby([x_col, color_col])[y_col].sum().reset_index()
-                        else:
-                            display_df = df.groupby(x_col)[y_col].sum().reset_index()
-                    
-                    if chart_config['type'] == "Line Chart":
-                        fig = px.line(display_df, x=x_col, y=y_col, color=color_col, title=chart_config['title'])
-                    elif chart_config['type'] == "Bar Chart":
-                        fig = px.bar(display_df, x=x_col, y=y_col, color=color_col, title=chart_config['title'])
-                    elif chart_config['type'] == "Scatter Plot":
-                        fig = px.scatter(display_df, x=x_col, y=y_col, color=color_col, title=chart_config['title'])
-                    elif chart_config['type'] == "Pie Chart":
-                        if color_col:
-                            fig = px.pie(display_df, values=y_col, names=color_col, title=chart_config['title'])
-                        else:
-                            fig = px.pie(display_df, values=y_col, names=x_col, title=chart_config['title'])
-                    elif chart_config['type'] == "Area Chart":
-                        fig = px.area(display_df, x=x_col, y=y_col, color=color_col, title=chart_config['title'])
-                    
-                    fig.update_layout(height=500)
+                    # Preview the same cached figure the image exports render
+                    display_df = chart_display_data(chart_config, df)
+                    fig = build_chart_figure(chart_config, df)
                     st.plotly_chart(fig, use_container_width=True)
                     
                     # Export options
@@ -419,7 +652,7 @@ def main():
                     
                     with export_format_col3:
                         if st.button("📊 Export Chart Data"):
-                            csv_data = display_df.to_csv(index=False)
+                            csv_data = frame_to_csv_bytes(display_df)
                             st.download_button(
                                 label="📥 Download CSV",
                                 data=csv_data,
@@ -1,139 +1,32 @@
 import streamlit as st
+import pandas as pd
 import json
 from datetime import datetime
 import zipfile
 import io
+from utils.dashboard_state import DashboardStateManager
 
 st.set_page_config(page_title="Deploy & Share", page_icon="🚀", layout="wide")
 
-def main():
-    st.title("🚀 Deploy & Share Your Analytics Platform")
-    st.markdown("Prepare your analytics platform for deployment and sharing")
-    
-    # Initialize session state
-    if 'dashboards' not in st.session_state:
-        st.session_state.dashboards = {}
-    if 'data_sources' not in st.session_state:
-        st.session_state.data_sources = {}
-    
-    tab1, tab2, tab3, tab4 = st.tabs(["🚀 Replit Deploy", "📦 Export Package", "⚙️ Settings", "👥 User Management"])
-    
-    with tab1:
-        st.header("Deploy to Replit")
-        st.markdown("""
-        ### Ready to deploy your analytics platform?
-        
-        Your platform is built with Streamlit and ready for deployment on Replit.
-        """)
-        
-        # Deployment checklist
-        st.subheader("📋 Pre-Deployment Checklist")
-        
-        checklist_items = [
-            ("Data Sources", len(st.session_state.data_sources) > 0, "Upload at least one data source"),
-            ("Dashboards", len(st.session_state.dashboards) > 0, "Create at least one dashboard"),
-            ("Charts", sum(len(d.get('charts', {})) for d in st.session_state.dashboards.values()) > 0, "Add charts to your dashboards"),
-        ]
-        
-        all_ready = True
-        for item, status, description in checklist_items:
-            col1, col2 = st.columns([1, 4])
-            with col1:
-                if status:
-                    st.success("✅")
-                else:
-                    st.error("❌")
-                    all_ready = False
-            with col2:
-                st.write(f"**{item}**: {description}")
-        
-        st.divider()
-        
-        if all_ready:
-            st.success("🎉 Your platform is ready for deployment!")
-            
-            # Deployment instructions
-            st.subheader("🚀 Deployment Steps")
-            st.markdown("""
-            1. **Click the Deploy button** in your Replit interface
-            2. **Choose deployment settings**:
-               - Set your app name
-               - Configure custom domain (optional)
-               - Set resource limits
-            3. **Environment variables** (if needed):
-               - No additional environment variables required for basic deployment
-            4. **Deploy and share** your analytics platform!
-            
-            ### Deployment Features Available:
-            - **Automatic HTTPS** and SSL certificates
-            - **Custom domains** for professional URLs
-            - **Automatic scaling** based on usage
-            - **Health monitoring** and uptime tracking
-            """)
-            
-            # Show deployment button simulation
-            st.info("💡 **Next Step**: Click the 'Deploy' button in your Replit sidebar to start the deployment process!")
-            
-        else:
-            st.warning("⚠️ Complete the checklist above before deploying")
-    
-    with tab2:
-        st.header("📦 Export Deployment Package")
-        st.markdown("Create a complete package of your platform for deployment elsewhere")
-        
-        if not st.session_state.dashboards:
-            st.warning("No dashboards to export. Create some dashboards first!")
-        else:
-            # Export options
-            st.subheader("Export Options")
-            
-            export_col1, export_col2 = st.columns(2)
-            
-            with export_col1:
-                include_sample_data = st.checkbox("Include sample data", value=True)
-                include_config = st.checkbox("Include dashboard configurations", value=True)
-                include_documentation = st.checkbox("Include documentation", value=True)
-            
-            with export_col2:
-                export_format = st.selectbox("Export Format", ["ZIP Package", "JSON Config Only"])
-                include_dependencies = st.checkbox("Include requirements.txt", value=True)
-            
-            # Generate export package
-            if st.button("📦 Generate Export Package", type="primary"):
-                try:
-                    # Create ZIP package
-                    zip_buffer = io.BytesIO()
-                    
-                    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                        # Add dashboard configurations
-                        if include_config:
-                            for dashboard_name, dashboard_data in st.session_state.dashboards.items():
-                                config_json = json.dumps(dashboard_data, indent=2, default=str)
-                                zip_file.writestr(f"dashboards/{dashboard_name}.json", config_json)
-                        
-                        # Add data sources
-                        if include_sample_data:
-                            for source_name, df in st.session_state.data_sources.items():
-                                csv_content = df.to_csv(index=False)
-                                zip_file.writestr(f"data/{source_name}.csv", csv_content)
-                        
-                        # Add requirements.txt
-                        if include_dependencies:
-                            requirements = """streamlit
-pandas
-plotly
-numpy
-reportlab
-openpyxl"""
-                            zip_file.writestr("requirements.txt", requirements)
-                        
-                        # Add documentation
-                        if include_documentation:
-                            readme_content = f"""# Analytics Platform Export
-                            
+TAB_LABELS = ("🚀 Replit Deploy", "📦 Export Package", "⚙️ Settings", "👥 User Management")
+
+# Pre-deployment checklist entries as (item, description)
+CHECKLIST_ITEMS = (
+    ("Data Sources", "Upload at least one data source"),
+    ("Dashboards", "Create at least one dashboard"),
+    ("Charts", "Add charts to your dashboards"),
+)
+
+AUTH_OPTIONS = ("None (Public Access)", "Simple Username/Password", "Firebase Auth", "Auth0", "Custom SSO")
+
+# Static parts of the export package
+REQUIREMENTS_BYTES = b"streamlit\npandas\nplotly\nnumpy\nreportlab\nopenpyxl\n"
+
+README_TEMPLATE = """# Analytics Platform Export
+
 ## Contents
 - dashboards/: Dashboard configurations in JSON format
-- data/: Sample data sources in CSV format
+- data/: Sample data sources in {data_format} format
 - requirements.txt: Python dependencies
 
 ## Deployment Instructions
@@ -149,210 +42,434 @@ openpyxl"""
 - **Heroku**: Use Procfile with `web: streamlit run app.py --server.port=$PORT`
 
 ## Data Sources
-{len(st.session_state.data_sources)} data sources included:
-{chr(10).join(f'- {name} ({len(df)} rows)' for name, df in st.session_state.data_sources.items())}
+{source_count} data sources included:
+{source_lines}
 
 ## Dashboards
-{len(st.session_state.dashboards)} dashboards included:
-{chr(10).join(f'- {name} ({len(data.get("charts", {}))} charts)' for name, data in st.session_state.dashboards.items())}
+{dashboard_count} dashboards included:
+{dashboard_lines}
 
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated on: {generated}
 """
-                            zip_file.writestr("README.md", readme_content)
-                    
-                    zip_buffer.seek(0)
-                    
-                    # Offer download
-                    st.download_button(
-                        label="📥 Download Export Package",
-                        data=zip_buffer.getvalue(),
-                        file_name=f"analytics_platform_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                        mime="application/zip"
-                    )
-                    st.success("Export package created successfully!")
-                    
-                except Exception as e:
-                    st.error(f"Failed to create export package: {str(e)}")
+
+def build_export_package(dashboards, data_sources, include_config, include_sample_data,
+                         include_dependencies, include_documentation, data_format="Parquet"):
+    """Build the deployment ZIP package, reusing it while its inputs are unchanged
     
-    with tab3:
-        st.header("⚙️ Platform Settings")
+    Only the dashboards, data and requirements are cached; the README carries
+    the generation time, so it is added to a copy of the cached archive on
+    every call.
+    """
+    if 'export_packages' not in st.session_state:
+        st.session_state.export_packages = {}
+    cache_key = (
+        json.dumps(dashboards, sort_keys=True, default=str),
+        tuple(data_sources),
+        include_config, include_sample_data, include_dependencies, data_format
+    )
+    frames = list(data_sources.values())
+    cached = st.session_state.export_packages.get(cache_key)
+    
+    # Reuse only while none of the data source frames has been replaced
+    if cached is not None and len(cached[0]) == len(frames) and all(a is b for a, b in zip(cached[0], frames)):
+        zip_bytes = cached[1]
+    else:
+        zip_bytes = _build_package_contents(dashboards, data_sources, include_config,
+                                            include_sample_data, include_dependencies, data_format)
+        # Only the latest package per session is worth keeping in memory
+        st.session_state.export_packages = {cache_key: (frames, zip_bytes)}
+    
+    if not include_documentation:
+        return zip_bytes
+    
+    source_lines = "\n".join([f"- {name} ({len(df)} rows)" for name, df in data_sources.items()])
+    dashboard_lines = "\n".join([
+        f"- {name} ({len(data.get('charts', {}))} charts)" for name, data in dashboards.items()
+    ])
+    readme_content = README_TEMPLATE.format(
+        data_format=data_format,
+        source_count=len(data_sources),
+        source_lines=source_lines,
+        dashboard_count=len(dashboards),
+        dashboard_lines=dashboard_lines,
+        generated=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    )
+    
+    # Appending to a copy leaves the cached archive without a README
+    zip_buffer = io.BytesIO(zip_bytes)
+    with zipfile.ZipFile(zip_buffer, 'a', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+        zip_file.writestr("README.md", readme_content)
+    return zip_buffer.getvalue()
+
+def _build_package_contents(dashboards, data_sources, include_config, include_sample_data,
+                            include_dependencies, data_format):
+    """ZIP bytes of the dashboards, data sources and requirements of an export package"""
+    # Create ZIP package
+    zip_buffer = io.BytesIO()
+    
+    # Level 1 DEFLATE: several times faster than the default 6 on CSV and JSON
+    # for a slightly larger archive; Parquet members are stored uncompressed
+    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zip_file:
+        # Add dashboard configurations
+        if include_config:
+            for dashboard_name, dashboard_data in dashboards.items():
+                config_json = DashboardStateManager.dumps_json(dashboard_data)
+                zip_file.writestr(f"dashboards/{dashboard_name}.json", config_json)
         
-        # App configuration
-        st.subheader("🎨 App Configuration")
-        app_col1, app_col2 = st.columns(2)
+        # Add data sources
+        if include_sample_data:
+            for source_name, df in data_sources.items():
+                if data_format == "Parquet":
+                    try:
+                        parquet_buffer = io.BytesIO()
+                        df.to_parquet(parquet_buffer, compression='zstd', index=False)
+                        # Parquet is already compressed, so store it without DEFLATE
+                        zip_file.writestr(f"data/{source_name}.parquet", parquet_buffer.getvalue(),
+                                          compress_type=zipfile.ZIP_STORED)
+                        continue
+                    except Exception:
+                        # Columns Arrow cannot type (e.g. mixed objects) fall back to CSV
+                        pass
+                
+                # Streamed into the archive in row chunks so no source is ever
+                # held as one complete CSV string
+                with zip_file.open(f"data/{source_name}.csv", 'w', force_zip64=True) as member:
+                    with io.TextIOWrapper(member, encoding='utf-8', newline='') as text:
+                        df.to_csv(text, index=False, chunksize=50_000)
         
-        with app_col1:
-            app_title = st.text_input("Application Title", value="Data Analytics Platform")
-            app_description = st.text_area("Description", value="Build custom dashboards and reports with ease")
-            enable_dark_mode = st.checkbox("Enable dark mode option")
+        # Add requirements.txt
+        if include_dependencies:
+            requirements = REQUIREMENTS_BYTES + (b"pyarrow\n" if data_format == "Parquet" else b"")
+            # A few bytes of text gain nothing from DEFLATE
+            zip_file.writestr("requirements.txt", requirements, compress_type=zipfile.ZIP_STORED)
+
+    return zip_buffer.getvalue()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def users_frame(user_rows):
+    """Table of users for display; passwords are already masked in user_rows"""
+    return pd.DataFrame(list(user_rows), columns=["Username", "Role", "Password"])
+
+@st.fragment
+def _tab_deploy():
+    """Deployment checklist and Replit instructions"""
+    st.header("Deploy to Replit")
+    st.markdown("""
+    ### Ready to deploy your analytics platform?
+    
+    Your platform is built with Streamlit and ready for deployment on Replit.
+    """)
+    
+    # Deployment checklist
+    st.subheader("📋 Pre-Deployment Checklist")
+    
+    # Only the pass/fail flags are computed per run; labels come from CHECKLIST_ITEMS
+    checklist_status = (
+        len(st.session_state.data_sources) > 0,
+        len(st.session_state.dashboards) > 0,
+        any(d.get('charts') for d in st.session_state.dashboards.values()),
+    )
+    
+    all_ready = True
+    for (item, description), status in zip(CHECKLIST_ITEMS, checklist_status):
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            if status:
+                st.success("✅")
+            else:
+                st.error("❌")
+                all_ready = False
+        with col2:
+            st.write(f"**{item}**: {description}")
+    
+    st.divider()
+    
+    if all_ready:
+        st.success("🎉 Your platform is ready for deployment!")
         
-        with app_col2:
-            default_chart_height = st.slider("Default Chart Height", 300, 800, 400)
-            auto_refresh = st.checkbox("Enable auto-refresh")
-            if auto_refresh:
-                refresh_interval = st.slider("Refresh Interval (seconds)", 30, 300, 60)
+        # Deployment instructions
+        st.subheader("🚀 Deployment Steps")
+        st.markdown("""
+        1. **Click the Deploy button** in your Replit interface
+        2. **Choose deployment settings**:
+           - Set your app name
+           - Configure custom domain (optional)
+           - Set resource limits
+        3. **Environment variables** (if needed):
+           - No additional environment variables required for basic deployment
+        4. **Deploy and share** your analytics platform!
         
-        # Performance settings
-        st.subheader("⚡ Performance Settings")
-        perf_col1, perf_col2 = st.columns(2)
+        ### Deployment Features Available:
+        - **Automatic HTTPS** and SSL certificates
+        - **Custom domains** for professional URLs
+        - **Automatic scaling** based on usage
+        - **Health monitoring** and uptime tracking
+        """)
         
-        with perf_col1:
-            max_data_rows = st.number_input("Max rows per data source", value=100000, min_value=1000)
-            enable_caching = st.checkbox("Enable data caching", value=True)
+        # Show deployment button simulation
+        st.info("💡 **Next Step**: Click the 'Deploy' button in your Replit sidebar to start the deployment process!")
         
-        with perf_col2:
-            chart_render_limit = st.number_input("Max data points per chart", value=5000, min_value=100)
-            lazy_loading = st.checkbox("Enable lazy loading", value=True)
+    else:
+        st.warning("⚠️ Complete the checklist above before deploying")
+
+@st.fragment
+def _tab_export():
+    """Export package options and download"""
+    st.header("📦 Export Deployment Package")
+    st.markdown("Create a complete package of your platform for deployment elsewhere")
+    
+    if not st.session_state.dashboards:
+        st.warning("No dashboards to export. Create some dashboards first!")
+    else:
+        # Export options
+        st.subheader("Export Options")
         
-        # Security settings
-        st.subheader("🔒 Security Settings")
-        security_col1, security_col2 = st.columns(2)
+        export_col1, export_col2 = st.columns(2)
         
-        with security_col1:
-            require_auth = st.checkbox("Require user authentication")
-            allow_data_export = st.checkbox("Allow data export", value=True)
+        with export_col1:
+            include_sample_data = st.checkbox("Include sample data", value=True)
+            include_config = st.checkbox("Include dashboard configurations", value=True)
+            include_documentation = st.checkbox("Include documentation", value=True)
         
-        with security_col2:
-            session_timeout = st.slider("Session timeout (hours)", 1, 24, 8)
-            max_file_size = st.slider("Max upload file size (MB)", 1, 100, 10)
+        with export_col2:
+            export_format = st.selectbox("Export Format", ["ZIP Package", "JSON Config Only"])
+            data_format = st.selectbox(
+                "Data Format",
+                ["Parquet", "CSV"],
+                help="Parquet is smaller and faster to write; CSV opens in any spreadsheet tool"
+            )
+            include_dependencies = st.checkbox("Include requirements.txt", value=True)
         
-        # Save settings
-        if st.button("💾 Save Settings", type="primary"):
-            settings = {
-                "app_title": app_title,
-                "app_description": app_description,
-                "enable_dark_mode": enable_dark_mode,
-                "default_chart_height": default_chart_height,
-                "auto_refresh": auto_refresh,
-                "refresh_interval": refresh_interval if auto_refresh else None,
-                "max_data_rows": max_data_rows,
-                "enable_caching": enable_caching,
-                "chart_render_limit": chart_render_limit,
-                "lazy_loading": lazy_loading,
-                "require_auth": require_auth,
-                "allow_data_export": allow_data_export,
-                "session_timeout": session_timeout,
-                "max_file_size": max_file_size,
-                "saved_at": datetime.now().isoformat()
-            }
-            
-            # Store in session state (in production, this would be stored in a database)
-            st.session_state.app_settings = settings
-            st.success("Settings saved successfully!")
+        # Generate export package
+        if st.button("📦 Generate Export Package", type="primary"):
+            try:
+                zip_bytes = build_export_package(
+                    st.session_state.dashboards,
+                    st.session_state.data_sources,
+                    include_config,
+                    include_sample_data,
+                    include_dependencies,
+                    include_documentation,
+                    data_format
+                )
+                
+                # Offer download
+                st.download_button(
+                    label="📥 Download Export Package",
+                    data=zip_bytes,
+                    file_name=f"analytics_platform_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime="application/zip"
+                )
+                st.success("Export package created successfully!")
+                
+            except Exception as e:
+                st.error(f"Failed to create export package: {str(e)}")
+
+@st.fragment
+def _tab_settings():
+    """Platform settings form"""
+    st.header("⚙️ Platform Settings")
     
-    with tab4:
-        st.header("👥 User Management")
-        st.markdown("Simple user management for your analytics platform")
+    # App configuration
+    st.subheader("🎨 App Configuration")
+    app_col1, app_col2 = st.columns(2)
+    
+    with app_col1:
+        app_title = st.text_input("Application Title", value="Data Analytics Platform")
+        app_description = st.text_area("Description", value="Build custom dashboards and reports with ease")
+        enable_dark_mode = st.checkbox("Enable dark mode option")
+    
+    with app_col2:
+        default_chart_height = st.slider("Default Chart Height", 300, 800, 400)
+        auto_refresh = st.checkbox("Enable auto-refresh")
+        if auto_refresh:
+            refresh_interval = st.slider("Refresh Interval (seconds)", 30, 300, 60)
+    
+    # Performance settings
+    st.subheader("⚡ Performance Settings")
+    perf_col1, perf_col2 = st.columns(2)
+    
+    with perf_col1:
+        max_data_rows = st.number_input("Max rows per data source", value=100000, min_value=1000)
+        enable_caching = st.checkbox("Enable data caching", value=True)
+    
+    with perf_col2:
+        chart_render_limit = st.number_input("Max data points per chart", value=5000, min_value=100)
+        lazy_loading = st.checkbox("Enable lazy loading", value=True)
+    
+    # Security settings
+    st.subheader("🔒 Security Settings")
+    security_col1, security_col2 = st.columns(2)
+    
+    with security_col1:
+        require_auth = st.checkbox("Require user authentication")
+        allow_data_export = st.checkbox("Allow data export", value=True)
+    
+    with security_col2:
+        session_timeout = st.slider("Session timeout (hours)", 1, 24, 8)
+        max_file_size = st.slider("Max upload file size (MB)", 1, 100, 10)
+    
+    # Save settings
+    if st.button("💾 Save Settings", type="primary"):
+        settings = {
+            "app_title": app_title,
+            "app_description": app_description,
+            "enable_dark_mode": enable_dark_mode,
+            "default_chart_height": default_chart_height,
+            "auto_refresh": auto_refresh,
+            "refresh_interval": refresh_interval if auto_refresh else None,
+            "max_data_rows": max_data_rows,
+            "enable_caching": enable_caching,
+            "chart_render_limit": chart_render_limit,
+            "lazy_loading": lazy_loading,
+            "require_auth": require_auth,
+            "allow_data_export": allow_data_export,
+            "session_timeout": session_timeout,
+            "max_file_size": max_file_size,
+            "saved_at": datetime.now().isoformat()
+        }
         
-        # User authentication info
-        st.subheader("🔐 Authentication Options")
+        # Store in session state (in production, this would be stored in a database)
+        st.session_state.app_settings = settings
+        st.success("Settings saved successfully!")
+
+@st.fragment
+def _tab_users():
+    """Authentication options and user management"""
+    st.header("👥 User Management")
+    st.markdown("Simple user management for your analytics platform")
+    
+    # User authentication info
+    st.subheader("🔐 Authentication Options")
+    
+    auth_option = st.selectbox(
+        "Choose Authentication Method",
+        AUTH_OPTIONS
+    )
+    
+    if auth_option == "None (Public Access)":
+        st.info("Your platform will be accessible to anyone with the URL")
+        st.markdown("""
+        **Pros:**
+        - Easy to deploy and share
+        - No setup required
+        - Good for demos and internal tools
         
-        auth_option = st.selectbox(
-            "Choose Authentication Method",
-            ["None (Public Access)", "Simple Username/Password", "Firebase Auth", "Auth0", "Custom SSO"]
-        )
+        **Cons:**
+        - No user-specific data
+        - No access control
+        - Data visible to all users
+        """)
         
-        if auth_option == "None (Public Access)":
-            st.info("Your platform will be accessible to anyone with the URL")
-            st.markdown("""
-            **Pros:**
-            - Easy to deploy and share
-            - No setup required
-            - Good for demos and internal tools
-            
-            **Cons:**
-            - No user-specific data
-            - No access control
-            - Data visible to all users
-            """)
-            
-        elif auth_option == "Simple Username/Password":
-            st.info("Basic authentication with predefined users")
-            
-            # Simple user management
-            st.subheader("👤 Manage Users")
-            
-            if 'users' not in st.session_state:
-                st.session_state.users = {"admin": {"password": "admin123", "role": "admin"}}
-            
-            # Add new user
-            with st.expander("➕ Add New User"):
-                new_username = st.text_input("Username")
-                new_password = st.text_input("Password", type="password")
-                new_role = st.selectbox("Role", ["viewer", "editor", "admin"])
-                
-                if st.button("Add User"):
-                    if new_username and new_password:
-                        st.session_state.users[new_username] = {
-                            "password": new_password,
-                            "role": new_role
-                        }
-                        st.success(f"User '{new_username}' added successfully!")
-                    else:
-                        st.error("Please provide username and password")
-            
-            # Display current users
-            st.subheader("Current Users")
-            if st.session_state.users:
-                user_data = []
-                for username, user_info in st.session_state.users.items():
-                    user_data.append([username, user_info.get('role', 'viewer'), '••••••••'])
-                
-                import pandas as pd
-                user_df = pd.DataFrame(user_data, columns=["Username", "Role", "Password"])
-                st.dataframe(user_df, use_container_width=True)
-            
-        elif auth_option in ["Firebase Auth", "Auth0"]:
-            st.info(f"Integration with {auth_option} requires additional setup")
-            st.markdown(f"""
-            **{auth_option} Setup Steps:**
-            1. Create account with {auth_option}
-            2. Configure authentication settings
-            3. Add API keys to environment variables
-            4. Implement authentication hooks in the application
-            
-            **Benefits:**
-            - Professional authentication
-            - Social login options
-            - User management dashboard
-            - Secure token-based auth
-            """)
-            
-            # Configuration inputs
-            if auth_option == "Firebase Auth":
-                st.subheader("Firebase Configuration")
-                firebase_api_key = st.text_input("Firebase API Key", type="password")
-                firebase_auth_domain = st.text_input("Auth Domain")
-                firebase_project_id = st.text_input("Project ID")
-                
-            elif auth_option == "Auth0":
-                st.subheader("Auth0 Configuration")
-                auth0_domain = st.text_input("Auth0 Domain")
-                auth0_client_id = st.text_input("Client ID")
-                auth0_client_secret = st.text_input("Client Secret", type="password")
+    elif auth_option == "Simple Username/Password":
+        st.info("Basic authentication with predefined users")
         
-        # Role-based access control
-        st.subheader("🛡️ Access Control")
-        st.markdown("""
-        **Role Permissions:**
+        # Simple user management
+        st.subheader("👤 Manage Users")
+        
+        if 'users' not in st.session_state:
+            st.session_state.users = {"admin": {"password": "admin123", "role": "admin"}}
+        
+        # Add new user
+        with st.expander("➕ Add New User"):
+            new_username = st.text_input("Username")
+            new_password = st.text_input("Password", type="password")
+            new_role = st.selectbox("Role", ["viewer", "editor", "admin"])
+            
+            if st.button("Add User"):
+                if new_username and new_password:
+                    st.session_state.users[new_username] = {
+                        "password": new_password,
+                        "role": new_role
+                    }
+                    st.success(f"User '{new_username}' added successfully!")
+                else:
+                    st.error("Please provide username and password")
         
-        **Viewer**
-        - View dashboards
-        - Use filters
-        - Export reports
+        # Display current users
+        st.subheader("Current Users")
+        if st.session_state.users:
+            user_rows = tuple(
+                (username, user_info.get('role', 'viewer'), '••••••••')
+                for username, user_info in st.session_state.users.items()
+            )
+            st.dataframe(users_frame(user_rows), use_container_width=True)
         
-        **Editor**
-        - All Viewer permissions
-        - Create/edit dashboards
-        - Upload data sources
-        - Manage charts
+    elif auth_option in ["Firebase Auth", "Auth0"]:
+        st.info(f"Integration with {auth_option} requires additional setup")
+        st.markdown(f"""
+        **{auth_option} Setup Steps:**
+        1. Create account with {auth_option}
+        2. Configure authentication settings
+        3. Add API keys to environment variables
+        4. Implement authentication hooks in the application
         
-        **Admin**
-        - All Editor permissions
-        - User management
-        - Platform settings
-        - Data source management
+        **Benefits:**
+        - Professional authentication
+        - Social login options
+        - User management dashboard
+        - Secure token-based auth
         """)
+        
+        # Configuration inputs
+        if auth_option == "Firebase Auth":
+            st.subheader("Firebase Configuration")
+            firebase_api_key = st.text_input("Firebase API Key", type="password")
+            firebase_auth_domain = st.text_input("Auth Domain")
+            firebase_project_id = st.text_input("Project ID")
+            
+        elif auth_option == "Auth0":
+            st.subheader("Auth0 Configuration")
+            auth0_domain = st.text_input("Auth0 Domain")
+            auth0_client_id = st.text_input("Client ID")
+            auth0_client_secret = st.text_input("Client Secret", type="password")
+    
+    # Role-based access control
+    st.subheader("🛡️ Access Control")
+    st.markdown("""
+    **Role Permissions:**
+    
+    **Viewer**
+    - View dashboards
+    - Use filters
+    - Export reports
+    
+    **Editor**
+    - All Viewer permissions
+    - Create/edit dashboards
+    - Upload data sources
+    - Manage charts
+    
+    **Admin**
+    - All Editor permissions
+    - User management
+    - Platform settings
+    - Data source management
+    """)
+
+def main():
+    st.title("🚀 Deploy & Share Your Analytics Platform")
+    st.markdown("Prepare your analytics platform for deployment and sharing")
+    
+    # Initialize session state
+    if 'dashboards' not in st.session_state:
+        st.session_state.dashboards = {}
+    if 'data_sources' not in st.session_state:
+        st.session_state.data_sources = {}
+    
+    tab1, tab2, tab3, tab4 = st.tabs(TAB_LABELS)
+    
+    with tab1:
+        _tab_deploy()
+    
+    with tab2:
+        _tab_export()
+    
+    with tab3:
+        _tab_settings()
+    
+    with tab4:
+        _tab_users()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,22 @@
 import streamlit as st
+import pandas as pd
 import json
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 import uuid
+import os
+import hashlib
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Faster JSON encoder for dashboard exports
+
+# On-disk location for saved dashboards (one directory per session, then per dashboard)
+DASHBOARD_CACHE_DIR = ".dp_cache"
+
+# Number of dashboard history entries kept in session state
+HISTORY_LIMIT = 100
 
 class DashboardStateManager:
     """Manage dashboard state and persistence"""
@@ -19,7 +34,8 @@ class DashboardStateManager:
             st.session_state.current_dashboard = None
         
         if 'dashboard_history' not in st.session_state:
-            st.session_state.dashboard_history = []
+            # Bounded deque drops the oldest entry itself on append
+            st.session_state.dashboard_history = deque(maxlen=HISTORY_LIMIT)
         
         if 'user_preferences' not in st.session_state:
             st.session_state.user_preferences = {
@@ -36,12 +52,13 @@ class DashboardStateManager:
             return False, "Dashboard name already exists"
         
         dashboard_id = str(uuid.uuid4())
+        now_iso = datetime.now().isoformat()
         dashboard_data = {
             'id': dashboard_id,
             'name': name,
             'description': description,
-            'created': datetime.now().isoformat(),
-            'modified': datetime.now().isoformat(),
+            'created': now_iso,
+            'modified': now_iso,
             'charts': {},
             'layout': {
                 'columns': 2,
@@ -83,11 +100,12 @@ class DashboardStateManager:
             return False, "Dashboard not found"
         
         chart_id = str(uuid.uuid4())
+        now_iso = datetime.now().isoformat()
         chart_config['id'] = chart_id
-        chart_config['created'] = datetime.now().isoformat()
+        chart_config['created'] = now_iso
         
         st.session_state.dashboards[dashboard_name]['charts'][chart_id] = chart_config
-        st.session_state.dashboards[dashboard_name]['modified'] = datetime.now().isoformat()
+        st.session_state.dashboards[dashboard_name]['modified'] = now_iso
         
         DashboardStateManager.add_to_history(dashboard_name, 'chart_added')
         
@@ -122,13 +140,23 @@ class DashboardStateManager:
         original_config = st.session_state.dashboards[dashboard_name]['charts'][chart_id]
         new_config['id'] = chart_id
         new_config['created'] = original_config.get('created')
-        new_config['modified'] = datetime.now().isoformat()
+        now_iso = datetime.now().isoformat()
+        new_config['modified'] = now_iso
         
         st.session_state.dashboards[dashboard_name]['charts'][chart_id] = new_config
-        st.session_state.dashboards[dashboard_name]['modified'] = datetime.now().isoformat()
+        st.session_state.dashboards[dashboard_name]['modified'] = now_iso
         
         return True, "Chart updated successfully"
     
+    @staticmethod
+    def _clone(obj):
+        """Deep copy of nested dicts and lists; leaf values are immutable and shared"""
+        if isinstance(obj, dict):
+            return {key: DashboardStateManager._clone(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [DashboardStateManager._clone(value) for value in obj]
+        return obj
+    
     @staticmethod
     def duplicate_dashboard(original_name, new_name):
         """Duplicate an existing dashboard"""
@@ -140,20 +168,22 @@ class DashboardStateManager:
         
         # Deep copy the original dashboard
         original = st.session_state.dashboards[original_name]
-        duplicated = json.loads(json.dumps(original, default=str))
+        duplicated = DashboardStateManager._clone(original)
         
         # Update metadata
+        now_iso = datetime.now().isoformat()
         duplicated['id'] = str(uuid.uuid4())
         duplicated['name'] = new_name
-        duplicated['created'] = datetime.now().isoformat()
-        duplicated['modified'] = datetime.now().isoformat()
+        duplicated['created'] = now_iso
+        duplicated['modified'] = now_iso
         
-        # Generate new IDs for charts
+        # Generate new IDs for charts from one batch of random bytes
+        raw = os.urandom(16 * len(duplicated['charts']))
         new_charts = {}
-        for chart_id, chart_config in duplicated['charts'].items():
-            new_chart_id = str(uuid.uuid4())
+        for index, chart_config in enumerate(duplicated['charts'].values()):
+            new_chart_id = str(uuid.UUID(bytes=raw[index * 16:(index + 1) * 16], version=4))
             chart_config['id'] = new_chart_id
-            chart_config['created'] = datetime.now().isoformat()
+            chart_config['created'] = now_iso
             new_charts[new_chart_id] = chart_config
         
         duplicated['charts'] = new_charts
@@ -163,6 +193,82 @@ class DashboardStateManager:
         
         return True, "Dashboard duplicated successfully"
     
+    @staticmethod
+    def _dashboard_dir(name):
+        """Directory holding a dashboard saved in this session
+        
+        Scoped to the session so users never overwrite or load each other's
+        saves; the name is hashed so distinct names never share a directory.
+        """
+        if 'storage_session_id' not in st.session_state:
+            st.session_state.storage_session_id = uuid.uuid4().hex
+        name_digest = hashlib.sha256(name.encode('utf-8')).hexdigest()
+        return os.path.join(DASHBOARD_CACHE_DIR, st.session_state.storage_session_id, name_digest)
+    
+    @staticmethod
+    def save_dashboard(name):
+        """Save a dashboard as JSON metadata plus Parquet files for its data sources"""
+        if name not in st.session_state.dashboards:
+            return False, "Dashboard not found"
+        
+        dashboard = st.session_state.dashboards[name]
+        used_sources = sorted(
+            {chart.get('data_source') for chart in dashboard.get('charts', {}).values()}
+            & set(st.session_state.data_sources)
+        )
+        
+        try:
+            target_dir = DashboardStateManager._dashboard_dir(name)
+            os.makedirs(target_dir, exist_ok=True)
+            
+            # Data source names may not be valid file names, so map them explicitly
+            source_files = {}
+            for index, source_name in enumerate(used_sources):
+                file_name = f"source_{index}.parquet"
+                st.session_state.data_sources[source_name].to_parquet(
+                    os.path.join(target_dir, file_name), compression='zstd'
+                )
+                source_files[source_name] = file_name
+            
+            # Drop data files left by earlier saves that used more sources
+            for file_name in os.listdir(target_dir):
+                if file_name.endswith('.parquet') and file_name not in source_files.values():
+                    os.remove(os.path.join(target_dir, file_name))
+            
+            meta = {
+                'name': name,
+                'dashboard': dashboard,
+                'data_sources': source_files,
+                'saved': datetime.now().isoformat(),
+                'version': '1.0'
+            }
+            with open(os.path.join(target_dir, "meta.json"), 'w') as f:
+                json.dump(meta, f, indent=2, default=str)
+            
+            return True, "Dashboard saved successfully"
+        except Exception as e:
+            return False, f"Save failed: {str(e)}"
+    
+    @staticmethod
+    def load_dashboard(name):
+        """Load a dashboard saved with save_dashboard back into session state"""
+        target_dir = DashboardStateManager._dashboard_dir(name)
+        meta_path = os.path.join(target_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return False, "Saved dashboard not found"
+        
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            
+            for source_name, file_name in meta.get('data_sources', {}).items():
+                st.session_state.data_sources[source_name] = pd.read_parquet(os.path.join(target_dir, file_name))
+            
+            st.session_state.dashboards[name] = meta['dashboard']
+            return True, "Dashboard loaded successfully"
+        except Exception as e:
+            return False, f"Load failed: {str(e)}"
+    
     @staticmethod
     def add_to_history(dashboard_name, action):
         """Add an action to dashboard history"""
@@ -173,10 +279,6 @@ class DashboardStateManager:
         }
         
         st.session_state.dashboard_history.append(history_entry)
-        
-        # Keep only last 100 entries
-        if len(st.session_state.dashboard_history) > 100:
-            st.session_state.dashboard_history = st.session_state.dashboard_history[-100:]
     
     @staticmethod
     def get_dashboard_stats():
@@ -196,6 +298,21 @@ class DashboardStateManager:
             'total_data_sources': len(st.session_state.data_sources)
         }
     
+    @staticmethod
+    def dumps_json(data):
+        """Indented JSON bytes for dashboard exports, encoded by orjson when installed"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    data,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                )
+            except TypeError:
+                # e.g. integers beyond 64 bits; the stdlib encoder handles them
+                pass
+        return json.dumps(data, indent=2, default=str).encode('utf-8')
+    
     @staticmethod
     def export_dashboard_state():
         """Export all dashboard state as JSON"""
@@ -207,7 +324,7 @@ class DashboardStateManager:
                 'version': '1.0'
             }
             
-            return json.dumps(state_data, indent=2, default=str)
+            return DashboardStateManager.dumps_json(state_data).decode('utf-8')
         except Exception as e:
             return None
     
@@ -240,22 +357,20 @@ class DashboardStateManager:
     def cleanup_session_state():
         """Clean up session state (remove old/unused data)"""
         # Remove dashboards with no charts that are older than 24 hours
-        current_time = datetime.now()
-        dashboards_to_remove = []
-        
-        for name, dashboard in st.session_state.dashboards.items():
-            if not dashboard.get('charts'):
-                created_time = datetime.fromisoformat(dashboard.get('created', current_time.isoformat()))
-                hours_old = (current_time - created_time).total_seconds() / 3600
-                
-                if hours_old > 24:
-                    dashboards_to_remove.append(name)
+        # ISO timestamps of the same layout sort chronologically, so each
+        # 'created' string is compared with the cutoff instead of parsed
+        cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
+        dashboards_to_remove = [
+            name for name, dashboard in st.session_state.dashboards.items()
+            if not dashboard.get('charts') and dashboard.get('created', cutoff) < cutoff
+        ]
         
         for name in dashboards_to_remove:
             del st.session_state.dashboards[name]
         
         # Clean up history (keep only last 50 entries)
-        if len(st.session_state.dashboard_history) > 50:
-            st.session_state.dashboard_history = st.session_state.dashboard_history[-50:]
+        history = st.session_state.dashboard_history
+        while len(history) > 50:
+            history.popleft()
         
         return len(dashboards_to_remove)
@@ -1,10 +1,175 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import json
 import hashlib
-from datetime import datetime, timedelta
+from datetime import datetime
 import pickle
 import os
+import io
+import zipfile
+import weakref
+import time
+import heapq
+
+try:
+    import numba
+except ImportError:
+    numba = None  # Optional JIT for the per-column numeric summary
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None  # Faster non-cryptographic digest for data hashes
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Faster JSON parser for the sample rows
+
+# Columns hashed together per pass in generate_data_hash
+HASH_COLUMN_GROUP = 32
+
+# id(frame) -> (weakref to the frame, fingerprint, hash) for frames already hashed
+_HASH_CACHE = {}
+
+# Numeric columns above which get_data_source_info summarizes with the Numba kernel
+PARALLEL_DESCRIBE_COLUMNS = 16
+
+# Frames wider than this count missing values with the parallel kernel
+WIDE_FRAME_COLUMNS = 500
+
+# Row order of the summary, matching DataFrame.describe()
+DESCRIBE_STATS = ('count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max')
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _describe_kernel(values):
+        # values is column-major; each column fills only its own output column
+        out = np.full((8, values.shape[1]), np.nan)
+        for j in numba.prange(values.shape[1]):
+            column = values[:, j]
+            present = np.sort(column[~np.isnan(column)])
+            n = present.shape[0]
+            out[0, j] = n
+            if n == 0:
+                continue
+            # Welford's running mean and sum of squared deviations
+            mean = 0.0
+            m2 = 0.0
+            for i in range(n):
+                delta = present[i] - mean
+                mean += delta / (i + 1)
+                m2 += delta * (present[i] - mean)
+            out[1, j] = mean
+            if n > 1:
+                out[2, j] = np.sqrt(m2 / (n - 1))
+            out[3, j] = present[0]
+            out[7, j] = present[n - 1]
+            # Linearly interpolated quartiles, as pandas computes them
+            for k, q in enumerate((0.25, 0.5, 0.75)):
+                position = q * (n - 1)
+                low = int(np.floor(position))
+                high = min(low + 1, n - 1)
+                out[4 + k, j] = present[low] + (present[high] - present[low]) * (position - low)
+        return out
+    
+    @numba.njit(parallel=True, cache=True)
+    def _nan_count_kernel(values):
+        # Each column writes only its own slot, so prange over columns is race-free
+        out = np.zeros(values.shape[1], np.int64)
+        for j in numba.prange(values.shape[1]):
+            count = 0
+            for i in range(values.shape[0]):
+                if values[i, j] != values[i, j]:
+                    count += 1
+            out[j] = count
+        return out
+else:
+    _describe_kernel = None
+    _nan_count_kernel = None
+
+class DataSourceInfo(dict):
+    """Data source info whose costlier entries are computed on first access
+    
+    Behaves like the plain dict get_data_source_info used to return:
+    iterating, len(), dict(info) and json.dumps(info) compute every lazy
+    entry first. 'numeric_summary' is only present when the frame has
+    numeric columns.
+    """
+    LAZY_KEYS = ('memory_usage', 'null_counts', 'sample_data', 'sample_data_json', 'dependencies', 'numeric_summary')
+    
+    def __init__(self, name, df, metadata):
+        super().__init__(
+            name=name,
+            shape=df.shape,
+            columns=list(df.columns),
+            dtypes=df.dtypes.to_dict(),
+            metadata=metadata
+        )
+        self._df = df
+    
+    def __missing__(self, key):
+        if key == 'memory_usage':
+            value = self._df.memory_usage(deep=True).sum()
+        elif key == 'null_counts':
+            value = DataStorageManager.count_missing(self._df).to_dict()
+        elif key == 'sample_data_json':
+            # pandas' C encoder writes the rows without boxing each cell into a Python object
+            value = self._df.head().to_json(orient='records', date_format='iso')
+        elif key == 'sample_data':
+            sample_json = self['sample_data_json']
+            value = orjson.loads(sample_json) if orjson is not None else json.loads(sample_json)
+        elif key == 'dependencies':
+            value = DataStorageManager.check_data_dependencies(self['name'])
+        elif key == 'numeric_summary':
+            value = DataStorageManager.numeric_summary(self._df)
+            if value is None:
+                raise KeyError(key)
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __contains__(self, key):
+        if key == 'numeric_summary' and not dict.__contains__(self, key):
+            return self.get(key) is not None
+        return key in self.LAZY_KEYS or dict.__contains__(self, key)
+    
+    def _resolve(self):
+        """Compute every lazy entry not read yet"""
+        for key in self.LAZY_KEYS:
+            self.get(key)
+    
+    def __iter__(self):
+        self._resolve()
+        return dict.__iter__(self)
+    
+    def __len__(self):
+        self._resolve()
+        return dict.__len__(self)
+    
+    def keys(self):
+        self._resolve()
+        return dict.keys(self)
+    
+    def values(self):
+        self._resolve()
+        return dict.values(self)
+    
+    def items(self):
+        self._resolve()
+        return dict.items(self)
+    
+    def copy(self):
+        self._resolve()
+        return dict(dict.items(self))
 
 class DataStorageManager:
     """Manage data storage and caching for the application"""
@@ -20,6 +185,14 @@ class DataStorageManager:
         
         if 'data_cache' not in st.session_state:
             st.session_state.data_cache = {}
+        
+        # Data source name -> keys of the data_cache entries derived from it
+        if 'data_cache_sources' not in st.session_state:
+            st.session_state.data_cache_sources = {}
+        
+        # Min-heap of (expiry, cache_key), so cleanup only visits expired entries
+        if 'data_cache_expiry' not in st.session_state:
+            st.session_state.data_cache_expiry = []
     
     @staticmethod
     def add_data_source(name, dataframe, metadata=None):
@@ -34,21 +207,52 @@ class DataStorageManager:
         st.session_state.data_sources[name] = dataframe
         
         # Store metadata
+        now_iso = datetime.now().isoformat()
         st.session_state.data_metadata[name] = {
             'name': name,
             'hash': data_hash,
-            'created': datetime.now().isoformat(),
-            'modified': datetime.now().isoformat(),
-            'rows': len(dataframe),
-            'columns': len(dataframe.columns),
-            'size_mb': dataframe.memory_usage(deep=True).sum() / 1024 / 1024,
-            'column_types': {col: str(dtype) for col, dtype in dataframe.dtypes.items()},
-            'missing_values': dataframe.isnull().sum().to_dict(),
+            'created': now_iso,
+            'modified': now_iso,
+            **DataStorageManager._frame_metadata(dataframe),
             'custom_metadata': metadata
         }
         
         return True, f"Data source '{name}' added successfully"
     
+    @staticmethod
+    def _dtypes_str(dataframe):
+        """Column name -> dtype name, converted in one pandas call"""
+        return dataframe.dtypes.astype(str).to_dict()
+    
+    @staticmethod
+    def _frame_metadata(dataframe):
+        """Shape, size, column types and missing counts of a frame, from one pass each"""
+        dtypes = dataframe.dtypes
+        missing = DataStorageManager.count_missing(dataframe)
+        # deep=True only changes the result for columns holding Python objects
+        deep = any(dtype == object or isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes)
+        return {
+            'rows': len(dataframe),
+            'columns': len(dataframe.columns),
+            'size_mb': dataframe.memory_usage(deep=deep).sum() / 1024 / 1024,
+            'column_types': DataStorageManager._dtypes_str(dataframe),
+            'missing_values': {col: int(count) for col, count in missing.items()}
+        }
+    
+    @staticmethod
+    def count_missing(df):
+        """Missing values per column, counted in parallel for wide float blocks"""
+        if _nan_count_kernel is None or len(df.columns) <= WIDE_FRAME_COLUMNS or not df.columns.is_unique:
+            return df.isnull().sum()
+        
+        float_cols = df.select_dtypes(include=['floating']).columns
+        other_cols = df.columns.difference(float_cols, sort=False)
+        float_counts = pd.Series(
+            _nan_count_kernel(np.asfortranarray(df[float_cols].to_numpy(np.float64))),
+            index=float_cols
+        )
+        return pd.concat([float_counts, df[other_cols].isnull().sum()]).reindex(df.columns)
+    
     @staticmethod
     def remove_data_source(name):
         """Remove a data source"""
@@ -74,7 +278,8 @@ class DataStorageManager:
         if name not in st.session_state.data_sources:
             return False, "Data source not found"
         
-        # Generate new hash
+        # Drop the replaced frame's cached hash before storing the new one
+        _HASH_CACHE.pop(id(st.session_state.data_sources[name]), None)
         new_hash = DataStorageManager.generate_data_hash(dataframe)
         
         # Update dataframe
@@ -86,11 +291,7 @@ class DataStorageManager:
             existing_metadata.update({
                 'hash': new_hash,
                 'modified': datetime.now().isoformat(),
-                'rows': len(dataframe),
-                'columns': len(dataframe.columns),
-                'size_mb': dataframe.memory_usage(deep=True).sum() / 1024 / 1024,
-                'column_types': {col: str(dtype) for col, dtype in dataframe.dtypes.items()},
-                'missing_values': dataframe.isnull().sum().to_dict()
+                **DataStorageManager._frame_metadata(dataframe)
             })
         else:
             DataStorageManager.add_data_source(name, dataframe)
@@ -101,12 +302,47 @@ class DataStorageManager:
         return True, f"Data source '{name}' updated successfully"
     
     @staticmethod
-    def generate_data_hash(dataframe):
-        """Generate a hash for data integrity checking"""
+    def _hash_fingerprint(dataframe):
+        """Cheap stand-in for the frame's contents: shape, block manager and index ends"""
+        index = dataframe.index
+        ends = (index[0], index[-1]) if len(index) else None
+        return (dataframe.shape, id(dataframe._mgr), ends)
+    
+    @staticmethod
+    def generate_data_hash(dataframe, use_cache=True):
+        """Generate a hash for data integrity checking
+        
+        With use_cache, a frame that was hashed before and still has the same
+        fingerprint returns its earlier hash. The fingerprint only covers shape,
+        block manager and index ends, so cell writes and df[col] = ... column
+        replacement keep it; pass use_cache=False whenever the contents must be
+        checked.
+        """
         try:
-            # Create a string representation of the dataframe
-            data_string = f"{dataframe.shape}_{dataframe.dtypes.to_string()}_{dataframe.head().to_string()}"
-            return hashlib.md5(data_string.encode()).hexdigest()
+            fingerprint = DataStorageManager._hash_fingerprint(dataframe)
+            cached = _HASH_CACHE.get(id(dataframe))
+            # The weak reference guards against a new frame reusing a freed id
+            if use_cache and cached is not None and cached[0]() is dataframe and cached[1] == fingerprint:
+                return cached[2]
+            
+            # 128-bit digests either way; integrity checks need no cryptographic hash
+            digest = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+            digest.update(repr((dataframe.shape, list(dataframe.columns), [str(t) for t in dataframe.dtypes])).encode())
+            
+            # Vectorized per-row hashes, taken a group of columns at a time so only
+            # one uint64 array per group is alive instead of a text rendering
+            for start in range(0, dataframe.shape[1], HASH_COLUMN_GROUP):
+                group = dataframe.iloc[:, start:start + HASH_COLUMN_GROUP]
+                digest.update(pd.util.hash_pandas_object(group, index=False, categorize=True).to_numpy().tobytes())
+            data_hash = digest.hexdigest()
+            
+            frame_id = id(dataframe)
+            _HASH_CACHE[frame_id] = (
+                weakref.ref(dataframe, lambda _, frame_id=frame_id: _HASH_CACHE.pop(frame_id, None)),
+                fingerprint,
+                data_hash
+            )
+            return data_hash
         except:
             return hashlib.md5(str(datetime.now()).encode()).hexdigest()
     
@@ -119,7 +355,8 @@ class DataStorageManager:
         if name not in st.session_state.data_metadata:
             return False, "Metadata not found"
         
-        current_hash = DataStorageManager.generate_data_hash(st.session_state.data_sources[name])
+        # Detecting in-place changes is the point here, so the fingerprint cache is bypassed
+        current_hash = DataStorageManager.generate_data_hash(st.session_state.data_sources[name], use_cache=False)
         stored_hash = st.session_state.data_metadata[name].get('hash')
         
         return current_hash == stored_hash, current_hash
@@ -146,37 +383,41 @@ class DataStorageManager:
             return None
         
         df = st.session_state.data_sources[name]
-        metadata = st.session_state.data_metadata.get(name, {})
-        
-        info = {
-            'name': name,
-            'shape': df.shape,
-            'columns': list(df.columns),
-            'dtypes': df.dtypes.to_dict(),
-            'memory_usage': df.memory_usage(deep=True).sum(),
-            'null_counts': df.isnull().sum().to_dict(),
-            'sample_data': df.head().to_dict('records'),
-            'metadata': metadata,
-            'dependencies': DataStorageManager.check_data_dependencies(name)
-        }
-        
-        # Add summary statistics for numeric columns
+        return DataSourceInfo(name, df, st.session_state.data_metadata.get(name, {}))
+    
+    @staticmethod
+    def numeric_summary(df):
+        """describe() of the numeric columns as a dict, or None without numeric columns"""
         numeric_cols = df.select_dtypes(include=['number']).columns
+        if _describe_kernel is not None and len(numeric_cols) > PARALLEL_DESCRIBE_COLUMNS:
+            # Columns are summarized in parallel from one float64 copy of the block
+            summary = _describe_kernel(np.asfortranarray(df[numeric_cols].to_numpy(np.float64, na_value=np.nan)))
+            return pd.DataFrame(summary, index=list(DESCRIBE_STATS), columns=numeric_cols).to_dict()
         if len(numeric_cols) > 0:
-            info['numeric_summary'] = df[numeric_cols].describe().to_dict()
-        
-        return info
+            return df[numeric_cols].describe().to_dict()
+        return None
     
     @staticmethod
-    def cache_processed_data(cache_key, data, expiry_minutes=30):
-        """Cache processed data for performance"""
-        expiry_time = datetime.now() + timedelta(minutes=expiry_minutes)
+    def cache_processed_data(cache_key, data, expiry_minutes=30, source_names=None):
+        """Cache processed data for performance
         
+        source_names lists the data sources the entry was derived from; when omitted,
+        every data source whose name appears in cache_key is assumed.
+        """
+        expiry = time.monotonic() + expiry_minutes * 60
         st.session_state.data_cache[cache_key] = {
             'data': data,
-            'expiry': expiry_time.isoformat(),
+            # Monotonic seconds, so expiry checks are a float comparison
+            'expiry': expiry,
             'created': datetime.now().isoformat()
         }
+        heapq.heappush(st.session_state.setdefault('data_cache_expiry', []), (expiry, cache_key))
+        
+        if source_names is None:
+            source_names = [name for name in st.session_state.data_sources if name in cache_key]
+        cache_sources = st.session_state.setdefault('data_cache_sources', {})
+        for source_name in source_names:
+            cache_sources.setdefault(source_name, set()).add(cache_key)
         
         # Clean up old cache entries
         DataStorageManager.cleanup_cache()
@@ -188,9 +429,8 @@ class DataStorageManager:
             return None
         
         cache_entry = st.session_state.data_cache[cache_key]
-        expiry_time = datetime.fromisoformat(cache_entry['expiry'])
         
-        if datetime.now() > expiry_time:
+        if time.monotonic() > cache_entry['expiry']:
             del st.session_state.data_cache[cache_key]
             return None
         
@@ -199,56 +439,87 @@ class DataStorageManager:
     @staticmethod
     def clear_cache_for_data_source(data_source_name):
         """Clear cache entries related to a specific data source"""
-        keys_to_remove = []
-        
-        for cache_key in st.session_state.data_cache.keys():
-            if data_source_name in cache_key:
-                keys_to_remove.append(cache_key)
-        
-        for key in keys_to_remove:
-            del st.session_state.data_cache[key]
+        cache_sources = st.session_state.setdefault('data_cache_sources', {})
+        for cache_key in cache_sources.pop(data_source_name, ()):
+            st.session_state.data_cache.pop(cache_key, None)
     
     @staticmethod
     def cleanup_cache():
         """Remove expired cache entries"""
-        current_time = datetime.now()
-        keys_to_remove = []
-        
-        for cache_key, cache_entry in st.session_state.data_cache.items():
-            expiry_time = datetime.fromisoformat(cache_entry['expiry'])
-            if current_time > expiry_time:
-                keys_to_remove.append(cache_key)
-        
-        for key in keys_to_remove:
-            del st.session_state.data_cache[key]
+        current_time = time.monotonic()
+        expiry_heap = st.session_state.setdefault('data_cache_expiry', [])
+        
+        while expiry_heap and expiry_heap[0][0] < current_time:
+            expiry, cache_key = heapq.heappop(expiry_heap)
+            cache_entry = st.session_state.data_cache.get(cache_key)
+            # Skip heap items left behind by entries that were re-cached or cleared
+            if cache_entry is not None and cache_entry['expiry'] == expiry:
+                del st.session_state.data_cache[cache_key]
     
     @staticmethod
     def export_data_sources():
-        """Export all data sources as a package"""
+        """Export all data sources as a ZIP of zstd Parquet files plus metadata.json"""
         try:
-            export_data = {
-                'data_sources': {},
-                'metadata': st.session_state.data_metadata,
-                'export_timestamp': datetime.now().isoformat(),
-                'version': '1.0'
-            }
+            buffer = io.BytesIO()
+            files = {}
             
-            # Convert dataframes to JSON-serializable format
-            for name, df in st.session_state.data_sources.items():
-                export_data['data_sources'][name] = {
-                    'data': df.to_dict('records'),
-                    'columns': list(df.columns),
-                    'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()}
+            # Parquet is already compressed, so the archive itself only stores
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+                for index, (name, df) in enumerate(st.session_state.data_sources.items()):
+                    # Data source names may not be valid file names, so map them explicitly
+                    file_name = f"source_{index}.parquet"
+                    parquet_buffer = io.BytesIO()
+                    df.to_parquet(parquet_buffer, compression='zstd')
+                    archive.writestr(file_name, parquet_buffer.getvalue())
+                    files[name] = file_name
+                
+                export_info = {
+                    'data_sources': files,
+                    'metadata': st.session_state.data_metadata,
+                    'export_timestamp': datetime.now().isoformat(),
+                    'version': '2.0'
                 }
+                archive.writestr("metadata.json", json.dumps(export_info, indent=2, default=str))
             
-            return json.dumps(export_data, indent=2, default=str)
+            return buffer.getvalue()
             
         except Exception as e:
             return None
     
     @staticmethod
-    def import_data_sources(json_data):
-        """Import data sources from JSON"""
+    def import_data_sources(export_bytes):
+        """Import data sources from an export_data_sources package
+        
+        JSON exports from version 1.0 (records per source) are still accepted.
+        """
+        if isinstance(export_bytes, str) or not zipfile.is_zipfile(io.BytesIO(export_bytes)):
+            return DataStorageManager._import_json_data_sources(export_bytes)
+        
+        try:
+            imported_count = 0
+            with zipfile.ZipFile(io.BytesIO(export_bytes)) as archive:
+                export_info = json.loads(archive.read("metadata.json"))
+                
+                for name, file_name in export_info.get('data_sources', {}).items():
+                    # Parquet keeps dtypes, so no per-column conversion is needed
+                    df = pd.read_parquet(io.BytesIO(archive.read(file_name)))
+                    success, message = DataStorageManager.add_data_source(name, df)
+                    if success:
+                        imported_count += 1
+            
+            # Import metadata
+            for name, metadata in export_info.get('metadata', {}).items():
+                if name in st.session_state.data_metadata:
+                    st.session_state.data_metadata[name].update(metadata)
+            
+            return True, f"Imported {imported_count} data sources successfully"
+            
+        except Exception as e:
+            return False, f"Import failed: {str(e)}"
+    
+    @staticmethod
+    def _import_json_data_sources(json_data):
+        """Import data sources from a version 1.0 JSON export"""
         try:
             import_data = json.loads(json_data)
             
@@ -295,7 +566,13 @@ class DataStorageManager:
         """Get statistics about data storage"""
         total_sources = len(st.session_state.data_sources)
         total_rows = sum(len(df) for df in st.session_state.data_sources.values())
-        total_memory = sum(df.memory_usage(deep=True).sum() for df in st.session_state.data_sources.values())
+        # size_mb is refreshed by add/update; only sources stored without them are measured
+        metadata = st.session_state.data_metadata
+        total_memory = sum(
+            metadata[name]['size_mb'] * 1024 * 1024 if 'size_mb' in metadata.get(name, {})
+            else df.memory_usage(deep=True).sum()
+            for name, df in st.session_state.data_sources.items()
+        )
         
         cache_entries = len(st.session_state.data_cache)
         